@@ -0,0 +1,74 @@
+"""
+micro benchmarks for constructing model instances from the parser output
+of the pubmed testdata
+
+    python benchmarks/construct.py [rounds]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from followthegrant.model import Article, Author, Documentation, Journal
+from followthegrant.parse import parsers
+
+
+def load():
+    results = []
+    for fpath in sorted(Path("testdata/pubmed").glob("*.nxml")):
+        try:
+            results.extend(parsers.jats(fpath))
+        except Exception:
+            pass
+    return [r for r in results if r.article and r.authors]
+
+
+def bench(func, items, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best / len(items)
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = load()
+    authors = [a for r in results for a in r.authors]
+    for result in results:
+        result.journal = Journal(**result.journal) if result.journal else None
+        result.authors = [Author(**a) for a in result.authors]
+    articles = [(r, r.article) for r in results]
+    documentations = []
+    for result in results:
+        article = Article(result, **result.article)
+        context = dict(article.properties)
+        context.pop("summary", None)
+        context.pop("description", None)
+        for author in result.authors:
+            documentations.append(
+                (article.documentation_context, context, article.id, author.id)
+            )
+
+    author = bench(lambda a: Author(**a), authors, rounds)
+    article = bench(lambda a: Article(a[0], **a[1]), articles, rounds)
+    documentation = bench(
+        lambda d: Documentation(document=d[2], entity=d[3], role="AUTHORSHIP", **d[1]),
+        documentations,
+        rounds,
+    )
+    documentation_clean = bench(
+        lambda d: Documentation.from_clean(
+            d[0], document=d[2], entity=d[3], role="AUTHORSHIP"
+        ),
+        documentations,
+        rounds,
+    )
+    print(f"articles:         {len(articles)}")
+    print(f"Author:           {author * 1e6:.1f} µs")
+    print(f"Article:          {article * 1e6:.1f} µs")
+    print(f"Documentation:    {documentation * 1e6:.1f} µs")
+    print(f"  from_clean:     {documentation_clean * 1e6:.1f} µs")
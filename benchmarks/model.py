@@ -0,0 +1,59 @@
+"""
+throughput of the model layer: generate the entities (without ner) from the
+parser results of the testdata, reading and parsing the source files is not
+measured
+
+    python benchmarks/model.py [parser:pattern ...]
+"""
+
+import copy
+import sys
+import time
+from pathlib import Path
+
+from followthegrant.parse import parsers
+from followthegrant.transform import make_proxies
+
+INPUTS = (
+    "jats:testdata/pubmed/*.nxml",
+    "jats:testdata/biorxiv/*.xml",
+    "jats:testdata/medrxiv/*/*.xml",
+    "europepmc:testdata/europepmc/*.gz",
+    "crossref:testdata/crossref/*.gz",
+)
+
+
+def load(inputs):
+    results = []
+    for item in inputs:
+        parser, pattern = item.split(":", 1)
+        parse = getattr(parsers, parser)
+        for fpath in sorted(Path().glob(pattern)):
+            try:
+                results.extend(parse(fpath))
+            except Exception:
+                pass
+    return results
+
+
+def bench(results, rounds=3):
+    best = None
+    for _ in range(rounds):
+        data = copy.deepcopy(results)  # make_proxies updates the results
+        start = time.perf_counter()
+        entities = 0
+        for result in data:
+            entities += sum(1 for _ in make_proxies(result, ner=False))
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best, entities
+
+
+if __name__ == "__main__":
+    results = load(sys.argv[1:] or INPUTS)
+    duration, entities = bench(results)
+    print(f"results:          {len(results)}")
+    print(f"entities:         {entities}")
+    print(f"duration:         {duration:.2f} s")
+    print(f"results / s:      {len(results) / duration:.0f}")
+    print(f"entities / s:     {entities / duration:.0f}")
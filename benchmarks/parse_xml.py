@@ -0,0 +1,86 @@
+"""
+benchmark per-article `parse_xml` time with the compiled xpath plan against
+evaluating the raw xpath strings from the mapping (previous behaviour)
+
+    python benchmarks/parse_xml.py testdata/pubmed/*.nxml testdata/biorxiv/*.xml
+"""
+
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import yaml
+from banal import ensure_dict, ensure_list, is_mapping
+from lxml import etree
+from normality import collapse_spaces
+
+from followthegrant.parse.xml import parse_xml, read_xml
+
+JATS_MAPPING = Path(__file__).parent.parent / "followthegrant/parse/parsers/jats.yml"
+
+
+def parse_props_raw(tree, mapping):
+    data = defaultdict(set)
+    for prop, paths in mapping.items():
+        if is_mapping(paths):
+            if "from" in paths:
+                prop_mapping = ensure_dict(paths.get("properties"))
+                for subpath in ensure_list(paths["from"]):
+                    for subtree in tree.xpath(subpath):
+                        data[prop] = ensure_list(data[prop])
+                        data[prop].append(parse_props_raw(subtree, prop_mapping))
+        else:
+            for path in paths:
+                for value in tree.xpath(path):
+                    if isinstance(value, etree._Element):
+                        if value.text is not None:
+                            value = value.text
+                        else:
+                            value = " ".join(value.itertext())
+                    if value:
+                        data[prop].add(collapse_spaces(value))
+    return data
+
+
+def parse_xml_raw(tree, mapping):
+    data = defaultdict(dict)
+    for key, config in mapping.items():
+        prop_mapping = ensure_dict(config.get("properties"))
+        root = config.get("from")
+        if root is not None:
+            data[key] = []
+            for path in ensure_list(root):
+                for item in tree.xpath(path):
+                    data[key].append(parse_props_raw(item, prop_mapping))
+        else:
+            data[key] = parse_props_raw(tree, prop_mapping)
+    return data
+
+
+def bench(func, trees, mapping, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for tree in trees:
+            func(tree, mapping)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best / len(trees)
+
+
+if __name__ == "__main__":
+    with open(JATS_MAPPING) as f:
+        mapping = yaml.safe_load(f)
+    trees = [read_xml(Path(p)) for p in sys.argv[1:]]
+    trees = [t for t in trees if t is not None]
+    if not trees:
+        sys.exit("usage: python benchmarks/parse_xml.py <xml files>")
+    for tree in trees:
+        assert parse_xml(tree, mapping) == parse_xml_raw(tree, mapping)
+    raw = bench(parse_xml_raw, trees, mapping)
+    compiled = bench(parse_xml, trees, mapping)
+    print(f"articles:         {len(trees)}")
+    print(f"raw xpath:        {raw * 1000:.3f} ms / article")
+    print(f"compiled plan:    {compiled * 1000:.3f} ms / article")
+    print(f"speedup:          {raw / compiled:.2f}x")
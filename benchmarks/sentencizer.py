@@ -0,0 +1,40 @@
+"""
+compare the rule based sentence splitting against the spacy sentencizer:
+agreement (identical sentences per statement) and throughput
+
+    python benchmarks/sentencizer.py testdata/medrxiv_cois.txt
+"""
+
+import sys
+import time
+
+from followthegrant.coi import get_nlp, split_sentences
+
+
+def bench(texts, sentencizer):
+    start = time.perf_counter()
+    res = [list(split_sentences(text, sentencizer)) for text in texts]
+    return time.perf_counter() - start, res
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python benchmarks/sentencizer.py <statements.txt>")
+    with open(sys.argv[1]) as f:
+        texts = [" ".join(line.split()) for line in f if line.strip()]
+
+    start = time.perf_counter()
+    get_nlp()
+    print(f"spacy load:       {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    spacy_time, spacy_res = bench(texts, "spacy")
+    regex_time, regex_res = bench(texts, "regex")
+    agree = sum(a == b for a, b in zip(spacy_res, regex_res))
+    sentences = sum(len(s) for s in spacy_res)
+    agree_sentences = sum(len(set(a) & set(b)) for a, b in zip(spacy_res, regex_res))
+    print(f"statements:       {len(texts)}")
+    print(f"agreement:        {agree / len(texts):.2%} statements")
+    print(f"                  {agree_sentences / sentences:.2%} sentences")
+    print(f"spacy:            {len(texts) / spacy_time:.0f} statements / s")
+    print(f"regex:            {len(texts) / regex_time:.0f} statements / s")
+    print(f"speedup:          {spacy_time / regex_time:.2f}x")
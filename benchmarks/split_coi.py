@@ -0,0 +1,121 @@
+"""
+stress benchmark for `split_coi` with synthetic consortium statements, compared
+against the recursive sentence assignment (previous behaviour)
+
+    python benchmarks/split_coi.py [authors] [sentences]
+"""
+
+import random
+import string
+import sys
+import time
+from collections import Counter, defaultdict
+
+from followthegrant import coi
+
+
+def make_name():
+    return "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9)))
+
+
+def make_statement(authors, sentences):
+    """
+    every sentence mentions authors, so that the whole statement is one chain
+    of sentences carried forward (the worst case for the recursion)
+    """
+    templates = (
+        "{first} {last} received consulting fees from Pfizer.",
+        "{initials} is an employee of Bayer.",
+        "{first} {last} and {first2} {last2} hold patents on the device.",
+    )
+    res = []
+    for _ in range(sentences - 1):
+        (first, last), (first2, last2) = random.sample(authors, 2)
+        initials = ".".join(n[0] for n in (*first.split(), last)) + "."
+        template = random.choice(templates)
+        res.append(template.format(**locals()))
+    res.append("All other authors declare no competing interests.")
+    return " ".join(res)
+
+
+def split_coi_recursive(coi_text, authors):
+    coi_text = " ".join(coi_text.split())
+    sentences = coi.split_sentences(coi_text)
+    surnames = Counter(last_name for _, last_name in authors)
+    author_tests = {a: list(coi._get_author_tests(a)) for a in authors}
+    for author, tests in author_tests.items():
+        if surnames[author[-1]] == 1:
+            tests.append(r"(^|\W){a}\W".format(a=author[-1]))
+    matcher = coi.AuthorMatcher(author_tests)
+    found_authors = set()
+
+    def _parse_sentence(sentence, current_authors=set()):
+        found = False
+        for author in matcher.match(sentence):
+            current_authors.add(author)
+            found_authors.add(author)
+            found = True
+            yield author, sentence
+        if found:
+            try:
+                yield from _parse_sentence(next(sentences), current_authors)
+            except StopIteration:
+                return
+        if not found:
+            if coi.REMAINING_AUTHORS.search(sentence):
+                current_authors.clear()
+                for author in author_tests:
+                    if author not in found_authors:
+                        yield author, sentence
+            elif len(current_authors):
+                for author in current_authors:
+                    yield author, sentence
+            else:
+                for author in author_tests:
+                    yield author, sentence
+
+    res = defaultdict(list)
+    for sentence in sentences:
+        for author, s in _parse_sentence(sentence):
+            res[author].append(s)
+    return res
+
+
+def bench(func, statements, authors, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for statement in statements:
+            res = func(statement, authors)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best / len(statements), res
+
+
+if __name__ == "__main__":
+    n_authors = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_sentences = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    random.seed(1)
+    authors = [
+        (
+            f"{make_name().title()} {random.choice(string.ascii_uppercase)}.",
+            make_name().title(),
+        )
+        for _ in range(n_authors)
+    ]
+    statements = [make_statement(authors, n_sentences) for _ in range(3)]
+    coi.get_nlp()  # load spacy before measuring
+
+    iterative, res = bench(coi.split_coi, statements, authors)
+    print(f"authors:          {n_authors}")
+    print(f"sentences:        {n_sentences}")
+    print(f"assignments:      {sum(len(s) for s in res.values())}")
+    print(f"iterative:        {iterative * 1000:.1f} ms / statement")
+    try:
+        recursive, res_recursive = bench(split_coi_recursive, statements, authors)
+    except RecursionError:
+        print("recursive:        RecursionError")
+    else:
+        assert res == res_recursive
+        print(f"recursive:        {recursive * 1000:.1f} ms / statement")
+        print(f"speedup:          {recursive / iterative:.2f}x")
@@ -0,0 +1,136 @@
+"""
+stress benchmark for the xref joins in `transform` with a synthetic consortium
+paper, compared against intersecting the xrefs of each pair (previous
+behaviour)
+
+    python benchmarks/transform.py [authors] [institutions] [grants]
+"""
+
+import random
+import sys
+import time
+
+from followthegrant import transform
+from followthegrant.model import (
+    Affiliation,
+    Author,
+    Employment,
+    Grant,
+    Institution,
+    ProjectParticipant,
+)
+
+
+def make_data(n_authors, n_institutions, n_grants):
+    institutions = [
+        Institution(name=f"Institution {i}", country="de", xref={f"aff{i}"})
+        for i in range(n_institutions)
+    ]
+    for institution in institutions:
+        institution.xref_grant_funder = {f"g{random.randrange(n_grants)}"}
+    grants = [Grant(name=f"Grant {i}", xref={f"g{i}"}) for i in range(n_grants)]
+    authors = [
+        Author(
+            name=f"Author{i} Consortium{i}",
+            xref_affiliation={f"aff{random.randrange(n_institutions)}" for _ in "abc"},
+            xref_employment={f"aff{random.randrange(n_institutions)}"},
+            xref_grant_recipient={f"g{random.randrange(n_grants)}"},
+            xref_grant_investigator={f"g{random.randrange(n_grants)}" for _ in "ab"},
+        )
+        for i in range(n_authors)
+    ]
+    return authors, institutions, grants
+
+
+def apply_institution_addresses_pairwise(authors, institutions):
+    for institution in institutions:
+        for author in authors:
+            if author.xref_affiliation & institution.xref:
+                author.address.update(institution.name)
+                author.address.update(institution.address)
+            if author.xref_employment & institution.xref:
+                author.address.update(institution.name)
+                author.address.update(institution.address)
+    return authors
+
+
+def make_affiliations_pairwise(institutions, authors):
+    for institution in institutions:
+        for author in authors:
+            if author.xref_affiliation & institution.xref:
+                yield Affiliation(
+                    organization=institution.id, member=author.id, role="AFFILIATION"
+                )
+            if author.xref_employment & institution.xref:
+                yield Employment(
+                    employer=institution.id, employee=author.id, role="EMPLOYMENT"
+                )
+
+
+def make_grant_relations_pairwise(grants, authors, institutions):
+    for grant in grants:
+        for author in authors:
+            if author.xref_grant_recipient & grant.xref:
+                yield ProjectParticipant(
+                    project=grant.id, participant=author.id, role="PARTICIPANT"
+                )
+            if author.xref_grant_investigator & grant.xref:
+                yield ProjectParticipant(
+                    project=grant.id, participant=author.id, role="INVESTIGATOR"
+                )
+        for institution in institutions:
+            if institution.xref_grant_funder & grant.xref:
+                yield ProjectParticipant(
+                    project=grant.id, participant=institution.id, role="FUNDER"
+                )
+
+
+def run_indexed(authors, institutions, grants):
+    transform.apply_institution_addresses(authors, institutions)
+    return [
+        r.id
+        for r in (
+            *transform.make_affiliations(institutions, authors),
+            *transform.make_grant_relations(grants, authors, institutions),
+        )
+    ]
+
+
+def run_pairwise(authors, institutions, grants):
+    apply_institution_addresses_pairwise(authors, institutions)
+    return [
+        r.id
+        for r in (
+            *make_affiliations_pairwise(institutions, authors),
+            *make_grant_relations_pairwise(grants, authors, institutions),
+        )
+    ]
+
+
+def bench(func, data, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        res = func(*data)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best, res
+
+
+if __name__ == "__main__":
+    n_authors = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_institutions = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    n_grants = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    random.seed(1)
+    data = make_data(n_authors, n_institutions, n_grants)
+
+    indexed, relations = bench(run_indexed, data)
+    pairwise, relations_pairwise = bench(run_pairwise, data)
+    assert relations == relations_pairwise
+    print(f"authors:          {n_authors}")
+    print(f"institutions:     {n_institutions}")
+    print(f"grants:           {n_grants}")
+    print(f"relations:        {len(relations)}")
+    print(f"indexed:          {indexed * 1000:.1f} ms / article")
+    print(f"pairwise:         {pairwise * 1000:.1f} ms / article")
+    print(f"speedup:          {pairwise / indexed:.2f}x")
@@ -0,0 +1,194 @@
+"""
+size bounded caches with hit / miss / eviction metrics
+
+`SQLiteCache`: persistent key-value cache in a local sqlite db, used to keep
+expensive results (e.g. ner analysis) across runs. Several processes on the
+same host can use the same db file.
+
+`cached`: per process lru cache for functions of one value, optionally in
+front of a shared `SQLiteCache`
+"""
+
+import os
+import sqlite3
+import time
+from collections import Counter
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, Callable
+
+from .logging import get_logger
+from .serialize import dumps, loads
+
+log = get_logger(__name__)
+
+
+class SQLiteCache:
+    """
+    store serializable values by (string) key, when there are more than
+    `max_size` entries the least recently used ones are evicted. The last use
+    of hits is written in batches of `touch_batch` keys (and before evicting)
+    instead of an update per lookup.
+    """
+
+    touch_batch = 1_000
+
+    def __init__(self, path: Path | str, max_size: int, name: str = "cache"):
+        self.path = Path(path)
+        self.max_size = max_size
+        self.name = name
+        self.counts = Counter()
+        self._used = set()
+        self._conn = None
+        self._pid = None
+        self.size = self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # connections can't be shared with forked worker processes
+        if self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (used)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get(self, key: str, default: Any | None = None) -> Any:
+        row = self.conn.execute(
+            "SELECT value FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.counts["misses"] += 1
+            value = default
+        else:
+            self.counts["hits"] += 1
+            self._used.add(key)
+            if len(self._used) >= self.touch_batch:
+                self.touch()
+            value = loads(row[0])
+        if (self.counts["hits"] + self.counts["misses"]) % 10_000 == 0:
+            log.info(f"Cache `{self.name}`", **self.get_stats())
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        value = dumps(value)
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO cache (key, value, used) VALUES (?, ?, ?)",
+            (key, value, now),
+        )
+        if cursor.rowcount:
+            self.size += 1
+            if self.size > self.max_size:
+                self.evict()
+        else:
+            self.conn.execute(
+                "UPDATE cache SET value = ?, used = ? WHERE key = ?", (value, now, key)
+            )
+
+    def touch(self) -> None:
+        """write the last use of the pending hits"""
+        if self._used:
+            now = time.time()
+            conn = self.conn
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE cache SET used = ? WHERE key = ?",
+                ((now, key) for key in self._used),
+            )
+            conn.execute("COMMIT")
+            self._used.clear()
+
+    def evict(self) -> None:
+        """remove the least recently used entries down to 90% of `max_size`"""
+        self.touch()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        limit = self.size - int(self.max_size * 0.9)
+        if limit > 0:
+            self.conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY used LIMIT ?)",
+                (limit,),
+            )
+            self.counts["evictions"] += limit
+            self.size -= limit
+
+    def get_stats(self) -> dict[str, int | float]:
+        lookups = self.counts["hits"] + self.counts["misses"]
+        return {
+            **self.counts,
+            "size": self.size,
+            "hit_rate": round(self.counts["hits"] / max(lookups, 1), 4),
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.touch()
+            self._conn.close()
+            self._conn = None
+            self._pid = None
+
+
+MISSING = object()
+CACHES: dict[str, Callable] = {}
+
+
+def cached(
+    name: str,
+    max_size: int,
+    store: Callable[[], SQLiteCache | None] | None = None,
+) -> Callable[[Callable], Callable]:
+    """
+    memoize a function of one hashable value in a lru cache with `max_size`
+    entries per process. Misses are looked up in the (shared) cache returned
+    by `store` before calling the function, only worth it if the function is
+    much slower than a sqlite lookup. The wrapped function has a `get_stats`
+    method, `get_cache_stats` returns the stats of all of them.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def compute(value):
+            db = store() if store is not None and value else None
+            if db is None:
+                return func(value)
+            key = f"{name}:{value}"
+            result = db.get(key, MISSING)
+            if result is MISSING:
+                result = func(value)
+                db.set(key, result)
+            return result
+
+        wrapper = lru_cache(max_size)(compute)
+
+        def get_stats() -> dict[str, int | float]:
+            info = wrapper.cache_info()
+            lookups = info.hits + info.misses
+            return {
+                "hits": info.hits,
+                "misses": info.misses,
+                # every miss is stored, so the ones not in there were evicted
+                "evictions": info.misses - info.currsize,
+                "size": info.currsize,
+                "hit_rate": round(info.hits / max(lookups, 1), 4),
+            }
+
+        wrapper.get_stats = get_stats
+        CACHES[name] = wrapper
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats() -> dict[str, dict[str, int | float]]:
+    return {name: func.get_stats() for name, func in CACHES.items()}
@@ -1,25 +1,31 @@
 import csv
-import json
+import multiprocessing
+import os
+import shutil
 import sys
+import tempfile
+import time
 from datetime import datetime
+from functools import partial
 
 import click
-from followthemoney.cli.util import MAX_LINE
 
 from . import settings
-from .coi import flag_coi
-from .db import insert_many
-from .dedupe import dedupe_triples, explode_triples
+from .exceptions import DedupeException, TransformException
 from .logging import configure_logging, get_logger
-from .parse import parse
-from .store import get_store
-from .util import get_path
-from .worker import DELETE_SOURCE, PARSE, QUEUES, BatchWorker, Worker
+from .serialize import dumps, loads
+
+# the commands import their (heavy) dependencies like pandas, spacy, the ftm
+# model or pika lazily to keep the startup time of the cli low
 
 log = get_logger(__name__)
 
+FLAG_COI_METHODS = ("ftg", "rtrans", "hristio")
+
 
 def readlines(stream):
+    from followthemoney.cli.util import MAX_LINE
+
     while True:
         line = stream.readline(MAX_LINE)
         if not line:
@@ -38,14 +44,99 @@ def cli(log_level):
     configure_logging(log_level, sys.stderr)
 
 
+def _dump_proxy(proxy) -> bytes:
+    return dumps(proxy.to_dict(), sort_keys=True)
+
+
+def _parse_file(
+    fpath: str,
+    parser: str,
+    dataset: str | None = None,
+    ner: dict[str, set[str] | None] | bool | None = None,
+    tmp_dir: str | None = None,
+) -> tuple[str, str, int, str | None]:
+    """
+    parse a single file in a worker process. The serialized entities are
+    written to a temporary file in `tmp_dir` as they are generated, so that
+    neither the worker nor the main process holds the output of a (huge,
+    multi-article) file in memory. Returns the temporary file path, the number
+    of entities and the error message, entities parsed before an error are kept
+    """
+    from .parse import parse
+
+    entities = 0
+    error = None
+    with tempfile.NamedTemporaryFile("wb", dir=tmp_dir, delete=False) as f:
+        try:
+            for proxy in parse(fpath, parser, dataset, ner):
+                f.write(_dump_proxy(proxy) + b"\n")
+                entities += 1
+        except Exception as e:
+            error = str(e)
+    return fpath, f.name, entities, error
+
+
+def _get_ner(ner: bool | None, ner_only: tuple[str]) -> list[str] | bool | None:
+    """ner stage from cli options, validated early"""
+    from .transform import get_ner_config
+
+    if ner_only:
+        if ner is False:
+            raise click.UsageError("`--ner-only` can't be combined with `--no-ner`")
+        ner = list(ner_only)
+    try:
+        get_ner_config(ner)
+    except TransformException as e:
+        raise click.BadParameter(str(e), param_hint="--ner-only")
+    return ner
+
+
+def ner_options(func):
+    func = click.option(
+        "--ner-only",
+        multiple=True,
+        help="Restrict ner to these schemata or properties (e.g. `Article:summary`)",
+    )(func)
+    return click.option(
+        "--ner/--no-ner",
+        default=None,
+        help="Run ner on documents, defaults to `NER` env setting",
+    )(func)
+
+
 @cli.command("parse")
 @click.argument("parser")
 @click.option("-f", "--file-path", type=click.Path(exists=True), default=None)
 @click.option("-i", "--infile", type=click.File("r"), default="-")
-@click.option("-o", "--outfile", type=click.File("w"), default="-")
+@click.option("-o", "--outfile", type=click.File("wb"), default="-")
 @click.option("-d", "--dataset", help="Append source (dataset) column with this value")
 @click.option("--ignore-errors/--raise-errors", default=True, show_default=True)
-def cli_parse(parser, file_path, infile, outfile, dataset, ignore_errors):
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of parallel parser processes",
+)
+@click.option(
+    "--ordered/--unordered",
+    default=False,
+    show_default=True,
+    help="Write results in input order when using multiple workers",
+)
+@ner_options
+def cli_parse(
+    parser,
+    file_path,
+    infile,
+    outfile,
+    dataset,
+    ignore_errors,
+    workers,
+    ordered,
+    ner,
+    ner_only,
+):
     """
     parse source xml/html files into json representation with metadata, authors,
     institutions and conflict of interest statements
@@ -57,26 +148,76 @@ def cli_parse(parser, file_path, infile, outfile, dataset, ignore_errors):
         openaire
         cord
     """
+    from .parse import parse
+    from .transform import get_ner_config
+
     if file_path is not None:
         paths = [file_path]
     else:
         paths = readlines(infile)
-    ix = 0
-    for ix, fpath in enumerate(paths):
-        try:
-            for proxy in parse(fpath, parser, dataset):
-                res = json.dumps(
-                    proxy.to_dict(), default=lambda x: str(x), sort_keys=True
-                )
-                outfile.write(res + "\n")
-        except Exception as e:
-            log.error(e, fpath=fpath)
-            if not ignore_errors:
-                log.error(exception=e, fpath=fpath)
-                raise click.ClickException(str(e))
-        if ix and ix % 1000 == 0:
-            log.info("Parsing file %d ..." % ix, fpath=str(fpath))
-    log.info("Parsed %d files." % (ix + 1))
+
+    ner = get_ner_config(_get_ner(ner, ner_only))
+    start = time.perf_counter()
+    files = entities = 0
+
+    def handle_error(error, fpath):
+        log.error(error, fpath=fpath)
+        if not ignore_errors:
+            raise click.ClickException(str(error))
+
+    def log_progress(fpath):
+        if files % 1000 == 0:
+            elapsed = time.perf_counter() - start
+            log.info(
+                "Parsing file %d ..." % files,
+                fpath=str(fpath),
+                files_per_sec=round(files / elapsed, 2),
+                entities_per_sec=round(entities / elapsed, 2),
+            )
+
+    if workers > 1:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="ftg-parse-")
+        with tmp_dir, multiprocessing.Pool(workers) as pool:
+            parse_file = partial(
+                _parse_file,
+                parser=parser,
+                dataset=dataset,
+                ner=ner,
+                tmp_dir=tmp_dir.name,
+            )
+            imap = pool.imap if ordered else pool.imap_unordered
+            for fpath, spool_path, spooled, error in imap(parse_file, paths):
+                files += 1
+                with open(spool_path, "rb") as f:
+                    shutil.copyfileobj(f, outfile)
+                os.unlink(spool_path)
+                entities += spooled
+                if error is not None:
+                    handle_error(error, fpath)
+                log_progress(fpath)
+    else:
+        for fpath in paths:
+            files += 1
+            try:
+                for proxy in parse(fpath, parser, dataset, ner):
+                    outfile.write(_dump_proxy(proxy) + b"\n")
+                    entities += 1
+            except Exception as e:
+                handle_error(e, fpath)
+            log_progress(fpath)
+
+    elapsed = time.perf_counter() - start
+    log.info(
+        "Parsed %d files." % files,
+        entities=entities,
+        files_per_sec=round(files / max(elapsed, 1e-9), 2),
+        workers=workers,
+    )
+    if workers == 1:
+        from .cache import get_cache_stats
+
+        for name, stats in get_cache_stats().items():
+            log.info(f"Cache `{name}`", **stats)
 
 
 @cli.command("explode-triples")
@@ -91,9 +232,11 @@ def _explode_triples(infile, outfile):
     entity_id,identifier,value
     ...
     """
+    from .dedupe import explode_triples
+
     writer = csv.writer(outfile)
     for data in readlines(infile):
-        data = json.loads(data)
+        data = loads(data)
         for triple in explode_triples(data):
             writer.writerow(triple)
 
@@ -101,41 +244,132 @@ def _explode_triples(infile, outfile):
 @cli.command("dedupe-triples")
 @click.option("-i", "--infile", type=click.File("r"), default="-")
 @click.option("-o", "--outfile", type=click.File("w"), default="-")
-def _dedupe_triples(infile, outfile):
+@click.option(
+    "--assume-sorted",
+    is_flag=True,
+    default=False,
+    help="Input is already sorted by relation, then target (2nd, 3rd column) in byte order",
+)
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=1_000_000,
+    show_default=True,
+    help="Number of triples per sorted chunk spilled to disk for unsorted input",
+)
+@click.option(
+    "--tmp-dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory for sorted chunks, defaults to system temp dir",
+)
+def _dedupe_triples(infile, outfile, assume_sorted, chunk_size, tmp_dir):
     """
     dedupe data based on triples,
     returns matching id pairs
+
+    triples are streamed in bounded memory, unsorted input is sorted via
+    temporary chunks on disk first. To skip this, pass input sorted by
+    (relation, target) in byte order:
+
+    LC_ALL=C sort -t, -k2,2 -k3,3 triples.csv | ftg dedupe-triples --assume-sorted
     """
+    from .dedupe import dedupe_sorted_triples, sort_triples
+
     triples = csv.reader(infile)
-    for pair in dedupe_triples(triples):
-        out = ",".join(pair)
-        outfile.write(out + "\n")
+    if not assume_sorted:
+        triples = sort_triples(triples, chunk_size, tmp_dir)
+    try:
+        for pair in dedupe_sorted_triples(triples):
+            out = ",".join(pair)
+            outfile.write(out + "\n")
+    except DedupeException as e:
+        raise click.ClickException(str(e))
+
+
+def _flag_rows(
+    rows: list[list[str]], methods: tuple[str, ...]
+) -> list[tuple[str, ...]]:
+    """
+    flag a chunk of csv rows, inserting the flags after the coi text column.
+    Rows that fail are logged and skipped
+    """
+    from .coi import get_flagger
+
+    flag = get_flagger(methods)
+    flagged = []
+    for row in rows:
+        try:
+            flags = flag(row[0])
+            flagged.append((row[0], *(int(f) for f in flags), *row[1:]))
+        except Exception as e:
+            log.error(f"{e.__class__.__name__}: {e}")
+            log.error(str(row))
+    return flagged
+
+
+def _chunk_rows(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        if not row:
+            log.error("Empty row")
+            continue
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 @cli.command("flag-cois")
 @click.option("-i", "--infile", type=click.File("r"), default="-")
 @click.option("-o", "--outfile", type=click.File("w"), default="-")
-def flag_cois(infile, outfile):
+@click.option(
+    "-m",
+    "--method",
+    type=click.Choice(FLAG_COI_METHODS),
+    multiple=True,
+    default=["ftg"],
+    show_default=True,
+    help="Flagging method, can be repeated to add a column per method",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of parallel flagging processes",
+)
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=10_000,
+    show_default=True,
+    help="Number of rows flagged at once",
+)
+def _flag_cois(infile, outfile, method, workers, chunk_size):
     """
     Flag COI statements if there is a conflict (1) or not (0)
-    Expects CSV from STDIN without header row to be able to process in parallel
+    Expects CSV from STDIN without header row,
     first column must be the coi text, all other columns will be passed through.
-    a new column is appended after the coi text column with the 0/1 flag
+    for each method a new column is inserted after the coi text column with
+    the 0/1 flag, in the order the methods are given
 
-    example parallel use (omit csv header via tail):
+    example use (omit csv header via tail):
 
-    cat cois.csv | tail -n +2 | parallel --pipe ftg flag_cois > cois.flagged.csv
+    cat cois.csv | tail -n +2 | ftg flag-cois -m ftg -m hristio --workers 4
     """
     reader = csv.reader(infile)
     writer = csv.writer(outfile)
-    for row in reader:
-        try:
-            coi = row[0]
-            flag = int(flag_coi(coi))
-            writer.writerow((row[0], flag, *row[1:]))
-        except Exception as e:
-            log.error(f"{e.__class__.__name__}: {e}")
-            log.error(str(row))
+    chunks = _chunk_rows(reader, chunk_size)
+    flag_rows = partial(_flag_rows, methods=tuple(method))
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for rows in pool.imap(flag_rows, chunks):
+                writer.writerows(rows)
+    else:
+        for chunk in chunks:
+            writer.writerows(flag_rows(chunk))
 
 
 @cli.group()
@@ -154,6 +388,8 @@ def db_init(recreate):
     """
     initialize required tables in Clickhouse
     """
+    from .store import get_store
+
     store = get_store()
     store.init(recreate=recreate)
 
@@ -170,9 +406,59 @@ def db_insert(infile, table, columns):
     currently a very simple approach: input csv without header, all columns must
     be present and in order of the existing `table`
     """
+    from .db import insert_many
+
     insert_many(table, columns.split(","), csv.reader(infile))
 
 
+@db.command("dedupe")
+@click.option("-o", "--outfile", type=click.File("w"), default="-")
+@click.option("-d", "--dataset", help="Filter triples for this dataset")
+@click.option(
+    "--workers",
+    type=int,
+    help="Number of worker processes, defaults to number of cpus",
+)
+@click.option(
+    "--max-in-flight",
+    type=int,
+    help="Max. number of packs submitted to the workers at once [default: 4 x workers]",
+)
+@click.option(
+    "--slow-lane-threshold",
+    type=int,
+    default=10_000,
+    show_default=True,
+    help="Packs with more candidates are deduped in a separate slow lane",
+)
+@click.option(
+    "--slow-lane-workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of worker processes for the slow lane",
+)
+def db_dedupe(
+    outfile, dataset, workers, max_in_flight, slow_lane_threshold, slow_lane_workers
+):
+    """
+    dedupe authors via triples packed by fingerprint in parallel and output
+    `canonical_id,author_id` pairs to `outfile`
+    """
+    from .dedupe import dedupe_from_db_parallel
+
+    writer = csv.writer(outfile)
+    pairs = dedupe_from_db_parallel(
+        dataset,
+        workers=workers,
+        max_in_flight=max_in_flight,
+        slow_lane_threshold=slow_lane_threshold,
+        slow_lane_workers=slow_lane_workers,
+    )
+    for pair in pairs:
+        writer.writerow(pair)
+
+
 # @db.command("dedupe-authors")
 # @click.option("-o", "--outfile", type=click.File("w"), default="-")
 # @click.option("-d", "--dataset", help="Filter triples for this dataset")
@@ -204,6 +490,8 @@ def db_insert(infile, table, columns):
 @click.pass_context
 def worker(ctx, queue):
     if ctx.invoked_subcommand is None:
+        from .worker import Worker
+
         log.info(f"Using data root: `{settings.DATA_ROOT}`")
         worker = Worker(queues=list(queue))
         worker.run()
@@ -222,6 +510,8 @@ def worker(ctx, queue):
     "--batch_size", type=int, help="Batch size", default=10_000, show_default=True
 )
 def batch_worker(queue, heartbeat, batch_size):
+    from .worker import BatchWorker
+
     worker = BatchWorker(queues=list(queue), heartbeat=heartbeat, batch_size=batch_size)
     worker.run()
 
@@ -237,13 +527,21 @@ def batch_worker(queue, heartbeat, batch_size):
     show_default=True,
 )
 @click.option("--job-id", help="Job ID, will be auto generated if empty")
-def crawl(parser, pattern, dataset, delete_source=False, job_id=None):
+@ner_options
+def crawl(
+    parser, pattern, dataset, delete_source=False, job_id=None, ner=None, ner_only=()
+):
+    from .util import get_path
+    from .worker import DELETE_SOURCE, PARSE, QUEUES, Worker
+
+    ner = _get_ner(ner, ner_only)
     worker = Worker()
     payload = {
         "parser": parser,
         "dataset": dataset,
         "delete_source": delete_source,
         "job_id": job_id or datetime.now().isoformat(),
+        "ner": ner,
     }
     queues = set(QUEUES.keys())
     if not delete_source:
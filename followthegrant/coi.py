@@ -1,13 +1,114 @@
 import re
+import unicodedata
 from collections import Counter, defaultdict
+from functools import cache
+from typing import Callable, Iterable, Iterator
 
-from html2text import html2text
 from lxml import etree
-from normality import collapse_spaces, normalize
-from spacy.lang.en import English
+from normality import collapse_spaces, stringify
+from normality.constants import UNICODE_CATEGORIES
 
-nlp = English()
-nlp.add_pipe("sentencizer")
+from . import settings
+
+
+@cache
+def get_nlp():
+    """load the spacy sentencizer on first use, as it is slow to import"""
+    from spacy.lang.en import English
+
+    nlp = English()
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def _split_sentences_spacy(text: str) -> Iterator[str]:
+    for sentence in get_nlp()(text).sents:
+        yield sentence.text
+
+
+# abbreviations that don't end a sentence (taken from the spacy tokenizer)
+ABBREVIATIONS = frozenset(
+    (
+        *(f"{c}." for c in "abcdefghijklmnopqrstuvwxyzäöü"),
+        *"a.m. p.m. e.g. E.g. E.G. i.e. I.e. I.E. v.s. vs. co. Co. Corp. Inc. Ltd."
+        " Bros. Dr. Prof. Mr. Mrs. Ms. Messrs. Jr. St. Mt. Ph.D. Adm. Gen. Gov."
+        " Rep. Rev. Sen. Jan. Feb. Mar. Apr. Jun. Jul. Aug. Sep. Sept. Oct. Nov."
+        " Dec. Ak. Ala. Ariz. Ark. Calif. Colo. Conn. D.C. Del. Fla. Ga. Ia. Id."
+        " Ill. Ind. Kan. Kans. Ky. La. Mass. Md. Mich. Minn. Miss. Mo. Mont."
+        " N.C. N.D. N.H. N.J. N.M. N.Y. Neb. Nebr. Nev. Okla. Ore. Pa. S.C."
+        " Tenn. Va. Wash. Wis.".split(),
+    )
+)
+_TOKEN = re.compile(r"\S+")
+_TOKEN_END = re.compile(r"^(?P<base>.*?)(?P<mark>[.!?]+)[\"'”’)\]},;:]*$")
+_LEADING_PUNCT = re.compile(r"^[^\w\s]+")
+
+
+def _ends_sentence(token: str) -> bool:
+    """
+    whether a whitespace separated token ends with a sentence mark, following
+    the spacy tokenizer rules when a period is split from the word
+    """
+    match = _TOKEN_END.match(token)
+    if match is None:
+        return False
+    base, mark = match.group("base"), match.group("mark")
+    if "!" in mark or "?" in mark:
+        return True
+    if len(mark) > 1:  # ellipsis
+        return False
+    if not base:
+        return True
+    if base + mark in ABBREVIATIONS:
+        return False
+    last = base[-1]
+    if last.islower() or last.isdigit() or last in "%²-+\"'”’)]}":
+        return True
+    # acronyms (USA.) but not initials (P.A.)
+    return len(base) > 1 and last.isupper() and base[-2].isupper()
+
+
+def _split_sentences_regex(text: str) -> Iterator[str]:
+    """
+    rule based sentence splitting that mostly agrees with the spacy
+    sentencizer: a new sentence starts at the first word after a sentence
+    mark, leading punctuation stays with the previous sentence
+    """
+    start = 0
+    seen_end = False
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        if seen_end:
+            punct = _LEADING_PUNCT.match(token)
+            offset = punct.end() if punct is not None else 0
+            if offset < len(token):
+                yield text[start : match.start() + offset].strip()
+                start = match.start() + offset
+                seen_end = False
+        if _ends_sentence(token):
+            seen_end = True
+    if text[start:].strip():
+        yield text[start:].strip()
+
+
+SENTENCIZERS = {
+    "spacy": _split_sentences_spacy,
+    "regex": _split_sentences_regex,
+}
+
+
+def split_sentences(text: str, sentencizer: str | None = None) -> Iterator[str]:
+    """
+    split text into sentences with the given backend (`spacy` or `regex`,
+    default via `settings.COI_SENTENCIZER`) and additionally after company
+    names and titles
+    """
+    sentencizer = SENTENCIZERS[sentencizer or settings.COI_SENTENCIZER]
+    for sentence in sentencizer(text):
+        yield from re.split(
+            r"(?<=Ltd.\W)|(?<=Inc.\W)|(?<=Drs. \W)|(?<=Dr. \W)|(?<=Prof. \W)(?=[A-Z])",
+            sentence,
+        )
 
 
 def _get_author_tests(author):
@@ -50,6 +151,67 @@ def _test_sentence(sentence, tests):
             return True
 
 
+# 9. "remaining authors"
+REMAINING_AUTHORS = re.compile(
+    r"(^|\W)(all|the)\s+(other|remaining)\s+(co-)?authors?\W"
+    r"|(^|\W)(alle|die)\s+(anderen|übrigen)(\s+autoren)?\W",  # de
+    re.IGNORECASE,
+)
+
+_PREFIX = r"(^|\W)"
+_ANCHORS = {}
+
+
+def _get_anchor(test):
+    """
+    all author tests start with a word boundary and a literal character: a
+    sentence can only match if this prefix matches, so it is used as a cheap
+    prefilter
+    """
+    if test.startswith(_PREFIX):
+        char = test[len(_PREFIX)]
+        if char.isalnum() or char == " ":
+            if char not in _ANCHORS:
+                _ANCHORS[char] = re.compile(_PREFIX + char, re.IGNORECASE)
+            return _ANCHORS[char]
+
+
+class AuthorMatcher:
+    """
+    test sentences against all authors of an article at once: the tests of
+    each author are compiled into one alternation, and only authors whose
+    name starts (first letter of names or initials) appear in a sentence are
+    tested at all
+    """
+
+    def __init__(self, author_tests):
+        self.patterns = {}
+        self.anchors = defaultdict(list)
+        for author, tests in author_tests.items():
+            self.patterns[author] = re.compile(
+                "|".join("(?:%s)" % t for t in tests), re.IGNORECASE
+            )
+            anchors = {_get_anchor(t) for t in tests}
+            if None in anchors:  # no prefilter possible
+                anchors = {None}
+            for anchor in anchors:
+                self.anchors[anchor].append(author)
+
+    def match(self, sentence):
+        """return matching authors in the order they were added"""
+        candidates = set()
+        for anchor, authors in self.anchors.items():
+            if anchor is None or anchor.search(sentence):
+                candidates.update(authors)
+        if not candidates:
+            return []
+        return [
+            author
+            for author, pattern in self.patterns.items()
+            if author in candidates and pattern.search(sentence)
+        ]
+
+
 def _get_initials(author):
     # author: ("Firstname", "Lastname)
     for part in author:
@@ -58,9 +220,10 @@ def _get_initials(author):
                 yield name[0]
 
 
-def split_coi(coi_text, authors):
+def split_coi(coi_text, authors, sentencizer=None):
     """
     authors: [('FirstName', 'LastName'), ('FirstName MiddleName', 'LastName')]
+    sentencizer: sentence splitting backend, `spacy` (default) or `regex`
 
     return: (author1, [sentences]), (author2, ...)
 
@@ -75,14 +238,7 @@ def split_coi(coi_text, authors):
     9. Look for the remaining authors
     """
     coi_text = " ".join(coi_text.split())
-    sentences = (  # we need a generator here
-        s
-        for sentence in nlp(coi_text).sents
-        for s in re.split(
-            r"(?<=Ltd.\W)|(?<=Inc.\W)|(?<=Drs. \W)|(?<=Dr. \W)|(?<=Prof. \W)(?=[A-Z])",
-            sentence.text,
-        )
-    )
+    sentences = split_sentences(coi_text, sentencizer)
     surnames = Counter()
     author_tests = defaultdict(list)
 
@@ -96,63 +252,75 @@ def split_coi(coi_text, authors):
     # 8. unique last name
     unique_surnames = [s for s, i in surnames.items() if i == 1]
 
-    # 9. "remaining authors"
-    remaining_tests = (
-        r"(^|\W)(all|the)\s+(other|remaining)\s+(co-)?authors?\W",
-        r"(^|\W)(alle|die)\s+(anderen|übrigen)(\s+autoren)?\W",  # de
-    )
-
-    found_authors = set()
-
-    def _parse_sentence(sentence, current_authors=set()):
-        found = False
-        for author, tests in author_tests.items():
-            if author[-1] in unique_surnames:
-                tests = tests + [r"(^|\W){a}\W".format(a=author[-1])]
-            if _test_sentence(sentence, tests):
-                current_authors.add(author)
-                found_authors.add(author)
-                found = True
-                yield author, sentence
-
-        if found:
-            # continue next sentence with current authors:
-            try:
-                yield from _parse_sentence(next(sentences), current_authors)
-            except StopIteration:  # no more sentences
-                return
-
-        if not found:
-            # test for "remaining authors"
-            if _test_sentence(sentence, remaining_tests):
-                # clear current authors
-                current_authors.clear()
-                for author in author_tests:
-                    if author not in found_authors:
-                        yield author, sentence
-
-            # assign to current authors (from last sentence)
-            elif len(current_authors):
-                for author in current_authors:
-                    yield author, sentence
-
-            # or assign sentence to all authors
-            else:
-                for author in author_tests:
-                    yield author, sentence
+    for author, tests in author_tests.items():
+        if author[-1] in unique_surnames:
+            tests.append(r"(^|\W){a}\W".format(a=author[-1]))
+    matcher = AuthorMatcher(author_tests)
 
+    # assign sentences to authors in a single pass, state carried forward:
+    found_authors = set()  # all authors mentioned so far
+    current_authors = set()  # authors the following sentences refer to
     res = defaultdict(list)
     for sentence in sentences:
-        for author, s in _parse_sentence(sentence):
-            res[author].append(s)
+        matched = matcher.match(sentence)
+        if matched:
+            # continue next sentence with current authors
+            current_authors.update(matched)
+            found_authors.update(matched)
+            assigned = matched
+
+        # test for "remaining authors", and clear current authors
+        elif REMAINING_AUTHORS.search(sentence):
+            current_authors.clear()
+            assigned = [a for a in author_tests if a not in found_authors]
+
+        # assign to current authors (from last sentence)
+        elif current_authors:
+            assigned = current_authors
+
+        # or assign sentence to all authors
+        else:
+            assigned = author_tests
+
+        for author in assigned:
+            res[author].append(sentence)
 
     # return result
     return res
 
 
+class _CategoryTable(dict):
+    """`str.translate` table for `normality.category_replace`, filled lazily"""
+
+    def __missing__(self, ordinal):
+        char = chr(ordinal)
+        value = UNICODE_CATEGORIES.get(unicodedata.category(char), char)
+        self[ordinal] = value
+        return value
+
+
+_CATEGORY_TABLE = _CategoryTable()
+
+
+def normalize(text):
+    """
+    same result as `normality.normalize(text)` with its defaults, but the
+    unicode category replacement is done via a translation table instead of a
+    python loop over all characters
+    """
+    text = stringify(text)
+    if text is None:
+        return None
+    text = unicodedata.normalize("NFKD", text.lower()).translate(_CATEGORY_TABLE)
+    return collapse_spaces(text)
+
+
 def flag_coi(text):
     """flag potential conflict based on splitted coi (individual per author)"""
-    text = normalize(text.replace("\n", " "))
+    return _flag_coi(normalize(text))
+
+
+def _flag_coi(text):
     if not text:
         return False
     if "kein interessenkonflikt besteht" in text:
@@ -241,17 +409,11 @@ def flag_coi_rtrans(text):
     return True
 
 
-def flag_coi_hristio(text):
-    """
-    Hristios implementation:
-    https://docs.google.com/document/d/1_-Tb-1IvTKBgRetOE9Ih4fYupsjsYgzjo1f_I5t_IWY/edit
-    """
-    text = normalize(text) or ""
-    if re.search(
-        r"(the|all)\s+authors?\s+have\s+(declared\s+no|nothing\s+to\s+declare)", text
-    ):
-        return False
-
+HRISTIO_DECLARED_NOTHING = re.compile(
+    r"(the|all)\s+authors?\s+have\s+(declared\s+no|nothing\s+to\s+declare)"
+)
+HRISTIO_POSITIVE = tuple(
+    (f"{test} ", f"no {test} ")
     for test in (
         "consulting",
         "consultant",
@@ -282,69 +444,198 @@ def flag_coi_hristio(text):
         "remaining authors",
         "no other",
         "funders played",
-    ):
-        if f"{test} " in text and f"no {test} " not in text:
+    )
+)
+HRISTIO_NEGATIVE = (
+    "no conflict",
+    "no potential conflict",
+    "no competing",
+    "no financial",
+    "no known",
+    "nothing to report",
+    "none declared",
+    "no authors have",
+    "none of the authors have",
+)
+HRISTIO_RECEIVED = (" received ", " receives ", " recipient ")
+
+
+def flag_coi_hristio(text):
+    """
+    Hristios implementation:
+    https://docs.google.com/document/d/1_-Tb-1IvTKBgRetOE9Ih4fYupsjsYgzjo1f_I5t_IWY/edit
+    """
+    return _flag_coi_hristio(normalize(text) or "")
+
+
+def _flag_coi_hristio(text):
+    if HRISTIO_DECLARED_NOTHING.search(text):
+        return False
+
+    for test, negated in HRISTIO_POSITIVE:
+        if test in text and negated not in text:
             return True
 
-    for test in (
-        "no conflict",
-        "no potential conflict",
-        "no competing",
-        "no financial",
-        "no known",
-        "nothing to report",
-        "none declared",
-        "no authors have",
-        "none of the authors have",
-    ):
+    for test in HRISTIO_NEGATIVE:
         if test in text:
             return False
 
-    for test in ("received", "receives", "recipient"):
-        if f" {test} " in text:
+    for test in HRISTIO_RECEIVED:
+        if test in text:
             return True
 
     return False
 
 
-def extract_coi_from_fulltext(fpath):
-    from .parse.xml import read_xml
+# flagging methods by name, the normalized ones share the normalization
+FLAGGERS = {
+    "ftg": flag_coi,
+    "rtrans": flag_coi_rtrans,
+    "hristio": flag_coi_hristio,
+}
+_NORMALIZED_FLAGGERS = {
+    "ftg": _flag_coi,
+    "hristio": lambda text: _flag_coi_hristio(text or ""),
+}
 
-    tree = read_xml(fpath)
-    xpath = './/*[contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"),"interest") and (contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"),"competing") or contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"),"declaring") or contains(translate(text(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"),"conflict"))]'  # noqa
-    coi_statement = " ".join(
-        " ".join(t for t in el.itertext()) for el in tree.xpath(xpath)
-    )
+
+def get_flagger(
+    methods: Iterable[str] | None = ("ftg",)
+) -> Callable[[str], tuple[bool, ...]]:
+    """
+    resolve the given methods once and return a function that flags a coi
+    statement with all of them, returning a tuple of flags in the order of
+    `methods`. Each text is normalized only once for all methods that need it.
+    """
+    methods = tuple(methods)
+    for method in methods:
+        if method not in FLAGGERS:
+            raise ValueError(f"Unknown coi flag method: `{method}`")
+    funcs = tuple(_NORMALIZED_FLAGGERS.get(m, FLAGGERS[m]) for m in methods)
+    normalized = tuple(m in _NORMALIZED_FLAGGERS for m in methods)
+    needs_normalize = any(normalized)
+
+    def flag(text: str) -> tuple[bool, ...]:
+        normalized_text = normalize(text) if needs_normalize else None
+        return tuple(
+            func(normalized_text if n else text) for func, n in zip(funcs, normalized)
+        )
+
+    return flag
+
+
+def flag_cois(
+    texts: Iterable[str], methods: Iterable[str] | None = ("ftg",)
+) -> Iterator[tuple[bool, ...]]:
+    """
+    flag many coi statements with the given methods at once, yields a tuple of
+    flags per text in the order of `methods`
+    """
+    yield from map(get_flagger(methods), texts)
+
+
+COI_HEADING_TERMS = ("competing", "declaring", "conflict")
+
+# paragraph boundaries when expanding a coi heading to its statement
+COI_BLOCK_TAGS = frozenset(
+    ("p", "sec", "fn", "title", "list-item", "ref-list", "table-wrap", "back", "body")
+)
+
+
+def _first_text(el: etree._Element) -> str | None:
+    # the first text node, what `text()` in a xpath predicate evaluates
+    if el.text is not None:
+        return el.text
+    for child in el:
+        if child.tail is not None:
+            return child.tail
+
+
+def _find_coi_elements(tree: etree._Element) -> Iterator[etree._Element]:
+    """
+    elements whose (lowercased) text contains "interest" and one of the coi
+    heading terms, in document order. Checking `el.text` in python is a lot
+    faster than a case folding `translate()` xpath over the whole tree.
+    """
+    for el in tree.iter(etree.Element):
+        text = _first_text(el)
+        if text is None:
+            continue
+        text = text.lower()
+        if "interest" in text and any(t in text for t in COI_HEADING_TERMS):
+            yield el
+
+
+def _iter_events(
+    el: etree._Element, root: etree._Element | None = None
+) -> Iterator[tuple[str, etree._Element | str]]:
+    # text and block boundaries of `el` (incl. tail) and everything after it,
+    # but not beyond the end of `root` (e.g. an article within a wrapper)
+    while el is not None:
+        for event, node in etree.iterwalk(el, events=("start", "end")):
+            if isinstance(node.tag, str):
+                yield event, node
+                if event == "start" and node.text:
+                    yield "text", node.text
+            if event == "end" and node.tail and node is not el:
+                yield "text", node.tail
+        if el is root:
+            return
+        if el.tail:
+            yield "text", el.tail
+        sibling = el.getnext()
+        while sibling is None:
+            el = el.getparent()
+            if el is None or el is root:
+                return
+            yield "end", el
+            if el.tail:
+                yield "text", el.tail
+            sibling = el.getnext()
+        el = sibling
+
+
+def _expand_coi_heading(el: etree._Element, root: etree._Element | None = None) -> str:
+    """
+    a matched element with only a short text is a heading (or an inline label
+    like "<bold>Competing interests:</bold> None.") of the statement: return
+    its text and all following text until the end of the next paragraph
+    """
+    heading = True
+    has_content = False
+    parts = []
+    for event, value in _iter_events(el, root):
+        if event == "text":
+            parts.append(value)
+            if not heading and not has_content:
+                has_content = bool(value.strip())
+        else:
+            if value.tag == "ref-list":  # the references never belong to it
+                break
+            if value is el and event == "end":
+                heading = False
+            if value.tag in COI_BLOCK_TAGS:
+                if has_content:
+                    break
+                parts.append(" ")
+    return collapse_spaces("".join(parts))
+
+
+def extract_coi_from_tree(tree: etree._Element | etree._ElementTree) -> str | None:
+    """
+    find the coi statement in an already parsed xml tree, either from the
+    matched elements text or by expanding a matched heading
+    """
+    root = tree.getroot() if isinstance(tree, etree._ElementTree) else tree
+    elements = list(_find_coi_elements(root))
+    coi_statement = " ".join(" ".join(t for t in el.itertext()) for el in elements)
     if len(coi_statement) > 36:
         return coi_statement
     if coi_statement:
-        if isinstance(
-            fpath, etree._Element
-        ):  # FIXME make xml loading consistent everywhere
-            article_text = etree.tostring(fpath).decode()
-        else:
-            with open(fpath) as f:
-                article_text = f.read()
-        article_text = html2text(article_text)
-        coi_statement = coi_statement.replace("(", "\(").replace(")", "\)")  # noqa
-        match = re.search(coi_statement, article_text, flags=re.IGNORECASE)
-        if match is not None:
-            start_pos = match.start()
-            full_coi_text = ""
-            i = 0
-            while True:
-                char = article_text[start_pos + i]
-                try:
-                    if (
-                        char == "\n"
-                        and article_text[start_pos + i + 1] == "\n"
-                        and i > len(coi_statement)
-                    ):
-                        break
-                except IndexError:  # end of text
-                    break
-                else:
-                    full_coi_text += article_text[start_pos + i]
-                    i += 1
+        return _expand_coi_heading(elements[0], root)
+
+
+def extract_coi_from_fulltext(fpath):
+    from .parse.xml import read_xml
 
-            return collapse_spaces(full_coi_text)
+    return extract_coi_from_tree(read_xml(fpath))
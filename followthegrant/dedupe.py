@@ -1,12 +1,27 @@
+import csv
+import heapq
+import os
+import tempfile
+import time
+from array import array
 from collections import defaultdict
-from itertools import combinations
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from itertools import islice
+from operator import itemgetter
 from typing import Iterable, Iterator, Optional
 
-import networkx as nx
 import pandas as pd
 from followthemoney.types import registry
 from ftm_columnstore.query import Query
 
+from .exceptions import DedupeException
+from .intern import StringTable, TripleTable
 from .logging import get_logger
 from .model import CE, SKDict, make_proxy
 from .store import get_store
@@ -47,45 +62,249 @@ def explode_triples(proxy: SKDict | CE) -> Iterable[tuple[str, str, str]]:
                 yield row
 
 
+class UnionFind:
+    """
+    disjoint set forest (path halving + union by size) to collect connected
+    components of matching ids without building a full graph
+
+    works on the integer ids of a (shared) `StringTable`, parents and sizes
+    are kept in compact arrays indexed by them
+    """
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        self.strings = strings or StringTable()
+        self.parents = array("q")
+        self.sizes = array("q")
+        self.members = bytearray()
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add_id(self, ix: int) -> int:
+        size = len(self.parents)
+        if ix >= size:
+            self.parents.extend(range(size, ix + 1))
+            self.sizes.extend(array("q", [1]) * (ix + 1 - size))
+            self.members.extend(bytes(ix + 1 - size))
+        if not self.members[ix]:
+            self.members[ix] = 1
+            self.count += 1
+        return ix
+
+    def add(self, item: str) -> int:
+        return self.add_id(self.strings.add(item))
+
+    def root(self, ix: int) -> int:
+        parents = self.parents
+        while parents[ix] != ix:
+            parents[ix] = parents[parents[ix]]
+            ix = parents[ix]
+        return ix
+
+    def find(self, item: str) -> str:
+        return self.strings[self.root(self.add(item))]
+
+    def union_ids(self, a: int, b: int) -> int:
+        a, b = self.root(self.add_id(a)), self.root(self.add_id(b))
+        if a != b:
+            if self.sizes[a] < self.sizes[b]:
+                a, b = b, a
+            self.parents[b] = a
+            self.sizes[a] += self.sizes[b]
+        return a
+
+    def union(self, a: str, b: str) -> str:
+        return self.strings[self.union_ids(self.add(a), self.add(b))]
+
+    def components(self) -> Iterator[list[str]]:
+        groups: dict[int, list[str]] = defaultdict(list)
+        for ix, member in enumerate(self.members):
+            if member:
+                groups[self.root(ix)].append(self.strings[ix])
+        yield from groups.values()
+
+
 def dedupe_triples(
-    triples: Iterable[tuple[str, str, str]]
+    triples: Iterable[tuple[str, str, str]], path: Optional[str] = None
 ) -> Iterable[tuple[str, str]]:
     """
     dedupe things based on triples
 
     input:
         triples from entities (1st column id) that are candidates within a
-        deduping block
+        deduping block. They are interned into integer columns (memory mapped
+        at `path` if given) and only sources that share a target value within
+        the same relation are paired.
+
+    output:
+        `canonical, member` pairs for each group of matching ids, canonical is
+        the first id of the sorted group (and included as `canonical,
+        canonical`)
     """
+    table = TripleTable(path=path)
+    table.extend(triples)
+    components = UnionFind(table.strings)
+    for a, b in table.shared_pairs():
+        components.union_ids(a, b)
+    table.close()
+    yield from iter_canonical_pairs(components)
 
-    items: dict[str, dict[str, set]] = defaultdict(lambda: defaultdict(set))
-    for source, rel, target in triples:
-        items[rel][source].add(target)
-
-    rels: dict[tuple, str] = {}
-    for rel, sources in items.items():
-        # generate matching pairs
-        res: set[tuple] = set()
-        for a1, a2 in combinations(sources.items(), 2):
-            if a1[1] & a2[1]:  # they share some target values
-                pair = (a1[0], a2[0])  # matching source id pair
-                res.add(pair)  # store result
-                rels[pair] = rel  # keep track of which relation is this pair from
-
-    # generate graph from connected pairs
-    G = nx.Graph()
-    G.add_edges_from(res)
-    for components in nx.connected_components(G):
-        canonical, *rest = sorted(components)
+
+def iter_canonical_pairs(components: UnionFind) -> Iterator[tuple[str, str]]:
+    for members in components.components():
+        canonical, *rest = sorted(members)
         yield canonical, canonical
         for r in rest:
             yield canonical, r
 
 
-def dedupe_from_db(dataset: Optional[str] = None) -> Iterator[tuple[str, str, str]]:
+def sort_triples(
+    triples: Iterable[tuple[str, str, str]],
+    chunk_size: Optional[int] = 1_000_000,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[tuple[str, str, str]]:
+    """
+    external merge sort of triples by (relation, target): sorted chunks of
+    `chunk_size` triples are spilled to temporary csv files and merged
+    afterwards, so memory is bound by the chunk size and not the input size
+    """
+    key = itemgetter(1, 2)
+    triples = iter(triples)
+    chunks = []
+    try:
+        while True:
+            chunk = [tuple(t) for t in islice(triples, chunk_size)]
+            if not chunk:
+                break
+            chunk.sort(key=key)
+            if not chunks and len(chunk) < chunk_size:  # fits in memory
+                yield from chunk
+                return
+            fh = tempfile.TemporaryFile("w+", newline="", dir=tmp_dir)
+            csv.writer(fh).writerows(chunk)
+            fh.seek(0)
+            chunks.append(fh)
+            log.info(f"Spilled sorted chunk {len(chunks)} to disk", size=len(chunk))
+        yield from heapq.merge(*(map(tuple, csv.reader(fh)) for fh in chunks), key=key)
+    finally:
+        for fh in chunks:
+            fh.close()
+
+
+def dedupe_sorted_triples(
+    triples: Iterable[tuple[str, str, str]],
+) -> Iterator[tuple[str, str]]:
+    """
+    streaming version of `dedupe_triples` for triples sorted by (relation,
+    target): only the disjoint set of matching ids is kept in memory, not the
+    triples themselves. Use `sort_triples` for unsorted input.
+    """
+    components = UnionFind()
+    last_key = None
+    first = None
+    for source, rel, target in triples:
+        key = rel, target
+        if key != last_key:
+            if last_key is not None and key < last_key:
+                raise DedupeException(
+                    f"Triples not sorted by relation and target: `{key}` after `{last_key}`"
+                )
+            last_key = key
+            first = source
+        elif source != first:
+            components.union(first, source)
+    yield from iter_canonical_pairs(components)
+
+
+def dedupe_pack(
+    triples: Iterable[tuple[str, str, str]],
+) -> tuple[list[tuple[str, str]], int, float]:
+    """
+    dedupe one pack of `fingerprint,author_id,value_id` triples from
+    `Store.iterate_triple_packs`, return pairs, candidates count and duration
+    """
+    start = time.perf_counter()
+    triples = [(author_id, fp, value_id) for fp, author_id, value_id in triples]
+    pairs = list(dedupe_triples(triples))
+    return pairs, len(set(t[0] for t in triples)), time.perf_counter() - start
+
+
+def dedupe_from_db(dataset: Optional[str] = None) -> Iterator[tuple[str, str]]:
     store = get_store()
-    for triples in store.iterate_author_triple_packs(dataset=dataset):
-        yield from dedupe_triples(triples)
+    for triples in store.iterate_triple_packs(dataset=dataset):
+        pairs, _, _ = dedupe_pack(triples)
+        yield from pairs
+
+
+def dedupe_from_db_parallel(
+    dataset: Optional[str] = None,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    slow_lane_threshold: Optional[int] = 10_000,
+    slow_lane_workers: Optional[int] = 1,
+) -> Iterator[tuple[str, str]]:
+    """
+    dedupe the packs from `Store.iterate_triple_packs` in a process pool and
+    merge the resulting pairs.
+
+    at most `max_in_flight` packs are submitted per pool at once so that
+    reading from the database doesn't outrun the workers. Packs with more
+    than `slow_lane_threshold` candidates go to a separate pool, so that a few
+    huge blocks don't stall all the others.
+    """
+    workers = workers or os.cpu_count()
+    max_in_flight = max_in_flight or workers * 4
+    store = get_store()
+    components = UnionFind()
+    stats = defaultdict(int)
+
+    def collect(futures):
+        for future in futures:
+            pairs, candidates, duration = future.result()
+            lane, fingerprint = lanes.pop(future)
+            log.info(
+                f"Deduped pack of {candidates} candidates in {duration:.2f}s",
+                fingerprint=fingerprint,
+                lane=lane,
+                pairs=len(pairs),
+            )
+            stats[lane] += 1
+            for canonical, member in pairs:
+                components.union(canonical, member)
+
+    lanes: dict[Future, tuple[str, str]] = {}
+    with ProcessPoolExecutor(workers) as pool, ProcessPoolExecutor(
+        slow_lane_workers
+    ) as slow_pool:
+        pending = {"default": set(), "slow": set()}
+        for triples in store.iterate_triple_packs(dataset=dataset):
+            fingerprint = next(iter(triples))[0]
+            if len(set(t[1] for t in triples)) > slow_lane_threshold:
+                lane, executor, limit = "slow", slow_pool, slow_lane_workers * 2
+            else:
+                lane, executor, limit = "default", pool, max_in_flight
+            future = executor.submit(dedupe_pack, triples)
+            lanes[future] = lane, fingerprint
+            pending[lane].add(future)
+            while len(pending[lane]) >= limit:
+                # wait on both lanes, so that a full lane doesn't keep the
+                # finished packs of the other one from being collected
+                done, _ = wait(
+                    pending["default"] | pending["slow"], return_when=FIRST_COMPLETED
+                )
+                for futures in pending.values():
+                    futures -= done
+                collect(done)
+        for futures in pending.values():
+            collect(as_completed(futures))
+
+    log.info(
+        "Deduped %d packs." % sum(stats.values()),
+        slow_lane=stats["slow"],
+        dataset=dataset,
+    )
+    yield from iter_canonical_pairs(components)
 
 
 def update_canonical(dataset: Optional[str] = None) -> pd.DataFrame:
@@ -24,3 +24,7 @@ class ModelException(Exception):
 
 class TransformException(Exception):
     ...
+
+
+class DedupeException(Exception):
+    ...
@@ -1,6 +1,7 @@
 """
-helpers for ftm related stuff, mostly to use pydantic for proxies
+helpers for ftm related stuff, mostly to use typed models for proxies
 """
+
 from typing import Any, Generator, Iterable
 
 from followthemoney import model
@@ -9,7 +10,6 @@ from followthemoney.proxy import E, EntityProxy
 from followthemoney.util import make_entity_id
 from nomenklatura.entity import CE, CompositeEntity
 from normality import normalize
-from pydantic import BaseModel, create_model
 from zavod.util import join_slug
 
 from .exceptions import IdentificationException
@@ -19,14 +19,88 @@ EGenerator = Generator[CE, None, None]
 SKDict = dict[str, Any]
 Values = set[str] | None
 Properties = dict[Values]
+# ner stage: schema name -> text properties to analyze (`None` for all)
+NerConfig = dict[str, set[str] | None]
+
+
+class SchemaModel:
+    """
+    base for the generated schema classes: only populated properties are
+    stored (as sets), reading any other property of the schema returns (and
+    stores) an empty set. Property names are checked against the frozen set
+    `_fields` of the class, so construction and `get_properties` only depend
+    on the number of populated properties, not on the size of the schema.
+    Instances are plain dict-backed objects: the properties live in the
+    `_data` dict, private attributes in the instance `__dict__`.
+
+    `_fields` of subclasses are the ones of their bases plus their own
+    fields annotated as `Values` (like `xref`).
+    """
+
+    _schema = "Thing"
+    _fields: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = set()
+        for klass in cls.__mro__:
+            fields.update(vars(klass).get("_fields", ()))
+            for name, annotation in vars(klass).get("__annotations__", {}).items():
+                if annotation in ("Values", Values):
+                    fields.add(name)
+                    # class level defaults would shadow `__getattr__`
+                    if name in vars(klass):
+                        delattr(klass, name)
+        cls._fields = frozenset(fields)
+
+    def __init__(self, **data: SKDict):
+        fields = self._fields
+        self._data = {k: ensure_set(v) for k, v in data.items() if k in fields}
+
+    def __getattr__(self, name: str) -> Values:
+        # only called for names that are not set yet
+        if name in self._fields:
+            return self._data.setdefault(name, set())
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{name}'"
+        )
 
-
-def create_schema(schema: str) -> BaseModel:
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self._fields:
+            self._data[name] = value
+        elif name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            raise ValueError(
+                f'"{self.__class__.__name__}" object has no field "{name}"'
+            )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+    def dict(self) -> dict[str, Values]:
+        """populated properties (copies)"""
+        return {k: set(v) for k, v in self._data.items()}
+
+    def get_properties(self) -> Properties:
+        # return cleaned properties as sets
+        properties = {}
+        for k, v in self._data.items():
+            v = ensure_set(v)
+            if v:
+                properties[k] = v
+        return properties
+
+
+def create_schema(schema: str) -> type[SchemaModel]:
     schema = model.get(schema)
-    return create_model(
+    return type(
         schema.name,
-        **{k: (Values, set()) for k in schema.properties},
-        __base__=BaseModel,
+        (SchemaModel,),
+        {
+            "_schema": schema.name,
+            "_fields": frozenset(schema.properties),
+        },
     )
 
 
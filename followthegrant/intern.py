@@ -0,0 +1,141 @@
+"""
+compact integer interning for string ids
+
+long slug ids (`doi-10.1101-...`) are stored once in a `StringTable` and
+referenced by consecutive integer ids, so that bulk data like dedupe triples
+can be kept in fixed width integer columns instead of tuples of strings.
+"""
+
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+class StringTable:
+    """
+    intern strings to consecutive integer ids and back
+    """
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.ids
+
+    def __getitem__(self, ix: int) -> str:
+        return self.strings[ix]
+
+    def add(self, value: str) -> int:
+        ix = self.ids.get(value)
+        if ix is None:
+            ix = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return ix
+
+    def get(self, value: str) -> int | None:
+        return self.ids.get(value)
+
+
+class TripleTable:
+    """
+    `source,relation,target` triples of interned ids stored as fixed width
+    integer columns (int32 by default, use typecode "q" for int64).
+
+    if `path` is given, rows are spilled to this file in chunks of
+    `buffer_size` and memory mapped when reading them back.
+    """
+
+    def __init__(
+        self,
+        strings: StringTable | None = None,
+        path: str | Path | None = None,
+        typecode: str | None = "i",
+        buffer_size: int | None = 1_000_000,
+    ):
+        self.strings = strings or StringTable()
+        self.typecode = typecode
+        self.dtype = np.dtype(typecode)
+        self.path = path
+        self.buffer_size = buffer_size
+        self.rows = array(typecode)
+        self.size = 0
+        self._fh = open(path, "wb") if path is not None else None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, source: str, rel: str, target: str) -> None:
+        add = self.strings.add
+        self.rows.extend((add(source), add(rel), add(target)))
+        self.size += 1
+        if self._fh is not None and len(self.rows) >= self.buffer_size * 3:
+            self.flush()
+
+    def extend(self, triples: Iterable[tuple[str, str, str]]) -> None:
+        for source, rel, target in triples:
+            self.add(source, rel, target)
+
+    def flush(self) -> None:
+        if self._fh is not None and self.rows:
+            self.rows.tofile(self._fh)
+            self._fh.flush()
+            self.rows = array(self.typecode)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self.flush()
+            self._fh.close()
+            self._fh = None
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        get the triples as (n, 3) integer array, memory mapped if spilled to disk
+        """
+        if self.path is None:
+            data = np.frombuffer(self.rows, dtype=self.dtype)
+        else:
+            self.flush()
+            if not self.size:
+                data = np.empty(0, dtype=self.dtype)
+            else:
+                data = np.memmap(self.path, dtype=self.dtype, mode="r")
+        return data.reshape(-1, 3)
+
+    def __iter__(self) -> Iterator[tuple[str, str, str]]:
+        """
+        round trip back to the original string triples
+        """
+        strings = self.strings
+        for source, rel, target in self.to_numpy().tolist():
+            yield strings[source], strings[rel], strings[target]
+
+    def shared_pairs(
+        self, chunk_size: int | None = 100_000
+    ) -> Iterator[tuple[int, int]]:
+        """
+        yield pairs of source ids that share a target within the same relation:
+        rows are sorted by (relation, target) and each source is paired with
+        the first source of its group
+        """
+        data = self.to_numpy()
+        if not len(data):
+            return
+        order = np.lexsort((data[:, 2], data[:, 1]))
+        sources, rels, targets = (data[order, i] for i in range(3))
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = (rels[1:] != rels[:-1]) | (targets[1:] != targets[:-1])
+        group_starts = np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))
+        firsts = sources[group_starts]
+        mask = firsts != sources
+        firsts, sources = firsts[mask], sources[mask]
+        for ix in range(0, len(sources), chunk_size):
+            yield from zip(
+                firsts[ix : ix + chunk_size].tolist(),
+                sources[ix : ix + chunk_size].tolist(),
+            )
@@ -7,6 +7,7 @@ model classes behave like the ftm model, aka. all props are multi values and a
 the logic here is mostly used for deterministic id generation and automatic
 initialization of props based on adjacent things
 """
+
 from __future__ import annotations
 
 from collections import defaultdict
@@ -26,6 +27,7 @@ from .exceptions import ModelException
 from .ftm import (
     CE,
     Properties,
+    SchemaModel,
     SKDict,
     Values,
     get_first,
@@ -40,18 +42,17 @@ from .identifiers import IDENTIFIERS, clean_ident, pick_best
 from .util import clean_date, clean_list, clean_value, ensure_set, fp
 
 
-class BaseModel(PydanticBaseModel):
-    _schema = "Thing"
+class BaseModel(SchemaModel):
+    """
+    model for a ftm schema (combined with a generated class from
+    `ftm.schema`), values are cleaned on construction. Unknown properties
+    passed to `__init__` are ignored.
+    """
+
     _id_prefix = None
 
     xref: Values = set()  # internal references for relations
     ident: Values = set()  # allow arbitrary identifiers for `make_id`
-    _adjacents: ParsedResult | None = None
-    _extra_data: dict[Any, Any] | None = {}
-
-    class Config:
-        keep_untouched = (cached_property,)
-        underscore_attrs_are_private = True
 
     def __init__(
         self,
@@ -59,15 +60,41 @@ class BaseModel(PydanticBaseModel):
         extra_data: dict[Any, Any] | None = {},
         **data: SKDict,
     ):
+        self._data = self.clean(data)
+        self._adjacents = adjacents or ParsedResult()
+        self._extra_data = extra_data
+
+    @classmethod
+    def clean(cls, data: SKDict) -> Properties:
+        """clean the values of the properties of this class in `data`"""
+        fields = cls._fields
+        properties = {}
         for k, v in data.items():
+            if k not in fields:
+                continue
             values = ensure_set([clean_value(i) for i in clean_list(v)])
             if k in IDENTIFIERS:
-                data[k] = clean_ident(values, k)
+                properties[k] = clean_ident(values, k)
             else:
-                data[k] = values
-        super().__init__(**data)
-        self._adjacents = adjacents or ParsedResult()
-        self._extra_data = extra_data
+                properties[k] = values
+        return properties
+
+    @classmethod
+    def from_clean(
+        cls,
+        clean_data: Properties,
+        adjacents: ParsedResult | None = None,
+        **data: SKDict,
+    ) -> BaseModel:
+        """
+        trusted constructor for relations sharing the same (e.g. article)
+        context: `clean_data` is the result of `clean` of this class and is
+        taken as is, only `data` is cleaned
+        """
+        item = cls(adjacents, **data)
+        for k, v in clean_data.items():
+            item._data.setdefault(k, set(v))
+        return item
 
     @cached_property
     def proxy(self) -> CE:
@@ -89,14 +116,6 @@ class BaseModel(PydanticBaseModel):
     def properties(self):
         return self.get_properties()
 
-    def get_properties(self) -> Properties:
-        # return cleaned properties as sets
-        return {
-            k: ensure_set(v)
-            for k, v in clean_dict(self.dict()).items()
-            if k in self.__fields__ and ensure_set(v)
-        }
-
     @cached_property
     def fingerprint(self):
         if self.name:
@@ -157,8 +176,6 @@ class Journal(BaseModel, schema.Thing):
 
 
 class Institution(BaseModel, schema.Organization):
-    _schema = "Organization"
-
     xref_grant_funder: Values = set()
 
     def get_id_parts(self) -> Values:
@@ -166,24 +183,18 @@ class Institution(BaseModel, schema.Organization):
 
 
 class Affiliation(BaseModel, schema.Membership):
-    _schema = "Membership"
-
     def make_id(self) -> str:
         ident = make_safe_id(self.member, self.organization)
         return f"affiliation-{ident}"
 
 
 class Employment(BaseModel, schema.Employment):
-    _schema = "Employment"
-
     def make_id(self) -> str:
         ident = make_safe_id(self.employee, self.employer)
         return f"employment-{ident}"
 
 
 class Author(BaseModel, schema.Person):
-    _schema = "Person"
-
     xref_affiliation: Values = set()
     xref_employment: Values = set()
     xref_grant_recipient: Values = set()
@@ -204,8 +215,6 @@ class Author(BaseModel, schema.Person):
 
 
 class Documentation(BaseModel, schema.Documentation):
-    _schema = "Documentation"
-
     def make_id(self) -> str:
         role, document, entity = get_firsts(self.role, self.document, self.entity)
         ident = make_safe_id(document, entity)
@@ -213,8 +222,6 @@ class Documentation(BaseModel, schema.Documentation):
 
 
 class Statement(BaseModel, schema.PlainText):
-    _schema = "PlainText"
-
     # for splitted statement
     _author: Author | None = None
     _is_splitted: bool | None = False
@@ -276,29 +283,24 @@ class Statement(BaseModel, schema.PlainText):
 
     def get_documentations(self) -> Generator[Documentation, None, None]:
         article = self._adjacents.article
-        metadata = article.dict()
-        metadata.pop("summary", None)
-        metadata.pop("description", None)
-        yield Documentation(
+        yield Documentation.from_clean(
+            article.documentation_context,
             document=article.id,
             entity=self.id,
             role=self.label,
             summary=self.bodyText,
-            **metadata,
         )
         for statement in self.get_splitted_statements():
-            yield Documentation(
+            yield Documentation.from_clean(
+                article.documentation_context,
                 document=article.id,
                 entity=statement._author.id,
                 role=f"INDIVIDUAL_{self.label}",
                 summary=statement.bodyText,
-                **metadata,
             )
 
 
 class Article(BaseModel, schema.Article):
-    _schema = "Article"
-
     coi_statement: Values = set()
     ack_statement: Values = set()
     funding_statement: Values = set()
@@ -325,6 +327,17 @@ class Article(BaseModel, schema.Article):
         self.date = dates
         self.publishedAt = dates
 
+    @cached_property
+    def documentation_context(self) -> Properties:
+        """
+        article metadata for its documentations, cleaned once and shared via
+        `Documentation.from_clean`
+        """
+        context = dict(self.properties)
+        context.pop("summary", None)
+        context.pop("description", None)
+        return Documentation.clean(context)
+
     def get_id_parts(self) -> list[str]:
         """
         invoked when no identifier given, try to generate a unique id that
@@ -342,15 +355,12 @@ class Article(BaseModel, schema.Article):
 
 
 class ProjectParticipant(BaseModel, schema.ProjectParticipant):
-    _schema = "ProjectParticipant"
-
     def make_id(self) -> str:
         ident = make_safe_id(self.project, self.participant)
         return f"{self.key_prefix}-{ident}"
 
 
 class Grant(BaseModel, schema.Project):
-    _schema = "Project"
     _id_prefix = "grant"
 
 
@@ -366,3 +376,6 @@ class ParsedResult(PydanticBaseModel):
     grants: list[SKDict | Grant] | None = []
     affiliations: list[SKDict | Affiliation] | None = []
     employments: list[SKDict | Employment] | None = []
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -10,7 +10,13 @@ download the type predict model:
 curl -o "./models/model_type_prediction.ftz" "https://public.data.occrp.org/develop/models/types/type-08012020-7a69d1b.ftz"
 """
 
+from functools import cache
+from hashlib import sha1
+from typing import Iterable, TypeAlias
+
+import fasttext
 from followthemoney import model
+from followthemoney.property import Property
 from followthemoney.types import registry
 from ingestors.analysis import Analyzer
 from ingestors.analysis.aggregate import TagAggregator
@@ -18,22 +24,94 @@ from ingestors.analysis.extract import extract_entities
 from ingestors.analysis.language import detect_languages
 from ingestors.analysis.util import DOCUMENT, text_chunks
 from nomenklatura.entity import CE
+from normality import collapse_spaces
+
+from . import settings
+from .cache import SQLiteCache
+from .ftm import EGenerator, NerConfig, make_proxy
+
+# silence fasttext warnings when loading the language model
+fasttext.FastText.eprint = lambda x: None
+
+# cache key -> detected languages, tags
+AnalyzerCache: TypeAlias = dict[str, tuple[list[str], list[tuple[Property, str]]]]
+
 
-from .ftm import EGenerator, make_proxy
+@cache
+def get_ner_cache() -> SQLiteCache | None:
+    if settings.NER_CACHE:
+        return SQLiteCache(settings.NER_CACHE, settings.NER_CACHE_SIZE, name="ner")
 
 
-def analyze(entity: CE) -> EGenerator:
+def _get_cache_key(entity: CE, text: str) -> str:
+    # the result only depends on the (whitespace normalized) chunk, the
+    # languages already known for the entity and the models used
+    languages = (
+        *sorted(entity.get("language", quiet=True)),
+        *sorted(entity.get("detectedLanguage", quiet=True)),
+    )
+    key = "\n".join((settings.NER_MODEL_VERSION, *languages, collapse_spaces(text)))
+    return sha1(key.encode()).hexdigest()
+
+
+def _analyze_chunk(
+    entity: CE, text: str, cache: AnalyzerCache | None = None
+) -> list[tuple[Property, str]]:
+    """
+    detect languages and extract tags for a text chunk. Identical chunks are
+    looked up in the given (in memory) cache and the persistent ner cache
+    instead of analyzed again
+    """
+    store = get_ner_cache()
+    if cache is None and store is None:
+        detect_languages(entity, text)
+        return list(extract_entities(entity, text))
+
+    key = _get_cache_key(entity, text)
+    if cache is not None and key in cache:
+        languages, tags = cache[key]
+        entity.add("detectedLanguage", languages, quiet=True)
+        return tags
+
+    stored = store.get(key) if store is not None else None
+    if stored is not None:
+        languages, tags = stored
+        tags = [(model.get_qname(prop), tag) for prop, tag in tags]
+        entity.add("detectedLanguage", languages, quiet=True)
+    else:
+        detect_languages(entity, text)
+        tags = list(extract_entities(entity, text))
+        languages = entity.get("detectedLanguage", quiet=True)
+        if store is not None:
+            store.set(key, (languages, [(prop.qname, tag) for prop, tag in tags]))
+    if cache is not None:
+        cache[key] = languages, tags
+    return tags
+
+
+def analyze(
+    entity: CE,
+    cache: AnalyzerCache | None = None,
+    props: Iterable[str] | None = None,
+) -> EGenerator:
+    """analyze all text values of a document entity or only the given `props`"""
     if not entity.schema.is_a(DOCUMENT):
         yield entity
         return
 
     aggregator = TagAggregator()
-    texts = entity.get_type_values(registry.text)
+    if props is None:
+        texts = entity.get_type_values(registry.text)
+    else:
+        texts = []
+        for name in sorted(props):
+            prop = entity.schema.get(name)
+            if prop is not None and prop.type == registry.text:
+                texts.extend(entity.get(prop))
     countries = set()
 
     for text in text_chunks(texts):
-        detect_languages(entity, text)
-        for (prop, tag) in extract_entities(entity, text):
+        for prop, tag in _analyze_chunk(entity, text, cache):
             aggregator.add(prop, tag)
 
     results = list(aggregator.results())
@@ -59,3 +137,31 @@ def analyze(entity: CE) -> EGenerator:
         entity.add(prop, label, cleaned=True, quiet=True)
 
     yield make_proxy(entity)
+
+
+def analyze_many(
+    entities: Iterable[CE],
+    config: NerConfig | None = None,
+    cache: AnalyzerCache | None = None,
+) -> EGenerator:
+    """
+    analyze entities of the same scope (e.g. all entities of a parsed article),
+    identical text chunks (like the same sentences in the individual coi
+    statements of several authors) are only analyzed once
+
+    config: restrict analysis to these schemata and their properties, other
+    entities are passed through
+    cache: share the analyzed chunks across several calls for the same scope
+    """
+    if cache is None:
+        cache = {}
+    for entity in entities:
+        if config is None:
+            yield from analyze(entity, cache)
+            continue
+        for schema, props in config.items():
+            if entity.schema.is_a(schema):
+                yield from analyze(entity, cache, props)
+                break
+        else:
+            yield entity
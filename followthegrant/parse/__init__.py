@@ -5,7 +5,8 @@ from followthegrant import settings
 
 from ..exceptions import ParserException
 from ..logging import get_logger
-from ..transform import EGenerator, make_proxies
+from ..ftm import NerConfig
+from ..transform import EGenerator, get_ner_config, make_proxies
 from . import parsers
 
 log = get_logger(__name__)
@@ -20,9 +21,16 @@ def _exists(fpath: Path) -> bool:
     return True
 
 
-def parse(fpath: str | Path, parser: str, dataset: str | None = None) -> EGenerator:
+def parse(
+    fpath: str | Path,
+    parser: str,
+    dataset: str | None = None,
+    ner: NerConfig | bool | str | None = None,
+) -> EGenerator:
     """
     data input: output from any of the parsers in `ftg.parse.parsers`
+
+    ner: configuration for the ner stage, see `transform.get_ner_config`
     """
     parser_ = getattr(parsers, parser, None)
     if parser_ is None:
@@ -31,5 +39,6 @@ def parse(fpath: str | Path, parser: str, dataset: str | None = None) -> EGenera
     if not _exists(fpath):
         return
 
+    ner = get_ner_config(ner)
     for result in parser_(fpath):
-        yield from make_proxies(result, dataset)
+        yield from make_proxies(result, dataset, ner)
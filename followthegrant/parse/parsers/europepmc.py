@@ -12,8 +12,7 @@ usage (either use gzip files or extracted ones):
 """
 
 
-import gc
-from io import BytesIO
+import gzip
 from pathlib import Path
 from typing import Generator
 
@@ -22,34 +21,41 @@ from lxml import etree
 from ...exceptions import LoaderException, ParserException
 from ...logging import get_logger
 from ...transform import ParsedResult
-from ..util import load_or_extract
 from .jats import parse as parse_jats
 
 log = get_logger(__name__)
 
 
+def iter_articles(fpath: Path) -> Generator[etree._Element, None, None]:
+    """
+    stream article elements from a (gzipped) xml file with constant memory:
+    each article is cleared after it was consumed and preceding siblings are
+    removed from the parent, so the tree stays flat
+    """
+    opener = gzip.open if fpath.suffix == ".gz" else open
+    with opener(fpath, "rb") as f:
+        articles = etree.iterparse(f, tag="article", recover=True, huge_tree=True)
+        for _, el in articles:
+            yield el
+            el.clear()
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+
+
 def parse(fpath: Path) -> Generator[ParsedResult, None, None]:
     ix = 0
     try:
-        content = load_or_extract(fpath)
-        articles = etree.iterparse(
-            BytesIO(content.encode()), tag="article", recover=True, huge_tree=True
-        )
-        for _, el in articles:
+        for el in iter_articles(fpath):
             try:
                 yield from parse_jats(el)
             except Exception as e:
                 log.error(f"Cannot load via jats at `{fpath}`: `{e}`")
                 raise LoaderException(e)
-            # FIXME memory leaks?
-            el.clear()
-            del el
-            gc.collect()
             ix += 1
             if ix and ix % 100 == 0:
                 log.info("Parsing article %d ..." % ix)
-        del articles
-        gc.collect()
     except Exception as e:
         log.error(f"Cannot parse XML at `{fpath}`: `{e}`")
         raise ParserException(e)
@@ -20,7 +20,7 @@ from typing import Generator
 
 import yaml
 
-from ...coi import extract_coi_from_fulltext
+from ...coi import extract_coi_from_tree
 from ...exceptions import ParserException
 from ...logging import get_logger
 from ...transform import ParsedResult
@@ -54,11 +54,8 @@ def parse(fpath: Path | str) -> Generator[ParsedResult, None, None]:
         data = parse_xml(tree, XML_MAPPING)
         if data:
             if not data["article"]["coi_statement"]:
-                if fpath is not None:
-                    # try to extract from fulltext
-                    data["article"]["coi_statement"] = extract_coi_from_fulltext(
-                        input_data
-                    )
+                # try to extract from fulltext
+                data["article"]["coi_statement"] = extract_coi_from_tree(tree)
             fix_institution_names(data["institutions"])
             yield ParsedResult(**data)
         else:
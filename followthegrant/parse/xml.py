@@ -1,6 +1,6 @@
 from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from banal import ensure_dict, ensure_list, is_mapping
 from lxml import etree
@@ -46,22 +46,76 @@ def read_xml(path: str | bytes | Path | etree._Element) -> etree._ElementTree |
             log.error(f"Error parsing xml: {e}", fpath=path.name)
 
 
-def parse_props(tree: etree._Element, mapping: dict[str, list]) -> dict[str, list]:
-    data = defaultdict(set)
+PropsPlan = list[tuple[str, list[etree.XPath], "PropsPlan | None"]]
+MappingPlan = list[tuple[str, list[etree.XPath] | None, PropsPlan]]
+
+_PLANS: dict[tuple[int, str], tuple[Any, PropsPlan | MappingPlan]] = {}
+
+
+def compile_paths(paths: str | list[str]) -> list[etree.XPath]:
+    xpaths = []
+    for path in ensure_list(paths):
+        try:
+            xpaths.append(etree.XPath(path))
+        except Exception as e:
+            log.error(f"{e} at `{path}`")
+    return xpaths
+
+
+def compile_props(mapping: dict[str, list]) -> PropsPlan:
+    """
+    compile a properties mapping (including nested `from` / `properties`
+    mappings) into a plan of `etree.XPath` objects
+    """
+    plan = []
     for prop, paths in mapping.items():
         if is_mapping(paths):
             if "from" in paths:
-                subpaths = ensure_list(paths["from"])
                 prop_mapping = ensure_dict(paths.get("properties"))
-                for subpath in subpaths:
-                    for subtree in tree.xpath(subpath):
-                        # defaultdict is not hashable so we have to use list here
-                        data[prop] = ensure_list(data[prop])
-                        data[prop].append(parse_props(subtree, prop_mapping))
+                plan.append(
+                    (prop, compile_paths(paths["from"]), compile_props(prop_mapping))
+                )
         else:
-            for path in paths:
+            plan.append((prop, compile_paths(paths), None))
+    return plan
+
+
+def compile_mapping(mapping: dict[str, dict[str, str | list]]) -> MappingPlan:
+    plan = []
+    for key, config in mapping.items():
+        prop_mapping = ensure_dict(config.get("properties"))
+        root = config.get("from")
+        if root is not None:
+            root = compile_paths(root)
+        plan.append((key, root, compile_props(prop_mapping)))
+    return plan
+
+
+def get_plan(mapping: dict[str, Any], compiler: Callable) -> PropsPlan | MappingPlan:
+    """
+    compile on first use and cache the plan per mapping identity, so changes
+    to a mapping after its first use are not reflected
+    """
+    key = id(mapping), compiler.__name__
+    cached = _PLANS.get(key)
+    if cached is None or cached[0] is not mapping:
+        cached = _PLANS[key] = mapping, compiler(mapping)
+    return cached[1]
+
+
+def execute_props(tree: etree._Element, plan: PropsPlan) -> dict[str, list]:
+    data = defaultdict(set)
+    for prop, xpaths, sub_plan in plan:
+        if sub_plan is not None:
+            for xpath in xpaths:
+                for subtree in xpath(tree):
+                    # defaultdict is not hashable so we have to use list here
+                    data[prop] = ensure_list(data[prop])
+                    data[prop].append(execute_props(subtree, sub_plan))
+        else:
+            for xpath in xpaths:
                 try:
-                    values = tree.xpath(path)
+                    values = xpath(tree)
                     for value in values:
                         if isinstance(value, etree._Element):
                             if value.text is not None:
@@ -71,24 +125,26 @@ def parse_props(tree: etree._Element, mapping: dict[str, list]) -> dict[str, lis
                         if value:
                             data[prop].add(collapse_spaces(value))
                 except Exception as e:
-                    log.error(f"{e} at `{path}`")
+                    log.error(f"{e} at `{xpath.path}`")
     return data
 
 
+def parse_props(tree: etree._Element, mapping: dict[str, list]) -> dict[str, list]:
+    return execute_props(tree, get_plan(mapping, compile_props))
+
+
 def parse_xml(
     tree: etree._Element | None, mapping: dict[str, dict[str, str | list]]
 ) -> dict[str, list[Any] | set[Any]]:
     data = defaultdict(dict)
     if tree is None:
         return data
-    for key, config in mapping.items():
-        prop_mapping = ensure_dict(config.get("properties"))
-        root = config.get("from")
+    for key, root, plan in get_plan(mapping, compile_mapping):
         if root is not None:
             data[key] = []
-            for path in ensure_list(root):
-                for item in tree.xpath(path):
-                    data[key].append(parse_props(item, prop_mapping))
+            for xpath in root:
+                for item in xpath(tree):
+                    data[key].append(execute_props(item, plan))
         else:
-            data[key] = parse_props(tree, prop_mapping)
+            data[key] = execute_props(tree, plan)
     return data
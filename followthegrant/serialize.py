@@ -0,0 +1,35 @@
+"""
+fast json (de)serialization for entities and queue payloads
+
+based on `orjson`, output is utf-8 encoded `bytes` that can be written to
+binary streams or used as message body directly. The output is semantically
+identical to `json.dumps(data, default=str)`, except that sets are serialized
+as lists.
+"""
+
+from typing import Any
+
+import orjson
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(value: Any) -> Any:
+    # sets become lists, anything else (`Path`, `datetime`, ...) a string
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps(data: Any, sort_keys: bool | None = False) -> bytes:
+    option = OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else OPTIONS
+    return orjson.dumps(data, default=_default, option=option)
+
+
+def fragment(data: bytes) -> orjson.Fragment:
+    """already serialized json that `dumps` embeds as is"""
+    return orjson.Fragment(data)
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data)
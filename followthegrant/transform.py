@@ -6,9 +6,11 @@ from collections import defaultdict
 from typing import Generator, Iterable
 
 from banal import ensure_dict
+from followthemoney import model
 
+from . import settings
 from .exceptions import TransformException
-from .ftm import EGenerator, SKDict
+from .ftm import EGenerator, NerConfig, SKDict
 from .model import (
     CE,
     Affiliation,
@@ -24,7 +26,6 @@ from .model import (
     ProjectParticipant,
     Statement,
 )
-from .ner import analyze
 
 
 def get_article_context(context: SKDict) -> SKDict:
@@ -52,17 +53,56 @@ def merge_authors(authors: list[Author]) -> list[Author]:
     return merged_authors
 
 
+class XrefIndex:
+    """
+    positions of items by the values of their xref properties, to look up the
+    items referencing one of the given xrefs instead of intersecting the xref
+    sets of each pair of items (think of consortium papers with thousands of
+    authors and hundreds of institutions)
+    """
+
+    def __init__(self, items: Iterable[BaseModel] | None, *props: str):
+        self.items = list(items or ())
+        self.indexes: dict[str, dict[str, set[int]]] = {}
+        for prop in props:
+            index = defaultdict(set)
+            for position, item in enumerate(self.items):
+                for value in getattr(item, prop):
+                    index[value].add(position)
+            self.indexes[prop] = index
+
+    def get(self, prop: str, xref: Iterable[str]) -> set[int]:
+        index = self.indexes[prop]
+        positions = set()
+        for value in xref:
+            if value in index:
+                positions.update(index[value])
+        return positions
+
+    def match(
+        self, xref: Iterable[str]
+    ) -> Generator[tuple[BaseModel, list[bool]], None, None]:
+        """
+        yield the items (in their original order) that reference any of
+        `xref`, together with a flag for each of the indexed properties
+        """
+        matches = [self.get(prop, xref) for prop in self.indexes]
+        for position in sorted(set().union(*matches)):
+            yield self.items[position], [position in m for m in matches]
+
+
 def apply_institution_addresses(
     authors: list[Author], institutions: list[Institution] | None
 ) -> list[Author]:
     if not institutions:
         return authors
+    index = XrefIndex(authors, "xref_affiliation", "xref_employment")
     for institution in institutions:
-        for author in authors:
-            if author.xref_affiliation & institution.xref:
+        for author, (affiliated, employed) in index.match(institution.xref):
+            if affiliated:
                 author.address.update(institution.name)
                 author.address.update(institution.address)
-            if author.xref_employment & institution.xref:
+            if employed:
                 author.address.update(institution.name)
                 author.address.update(institution.address)
     return authors
@@ -71,43 +111,47 @@ def apply_institution_addresses(
 def make_publication(
     journal: Journal, article: Article
 ) -> Generator[Documentation, None, None]:
-    context = get_article_context(article.properties)
-    yield Documentation(
+    yield Documentation.from_clean(
+        article.documentation_context,
         document=article.id,
         entity=journal.id,
         role="PUBLISHER",
-        **context,
     )
 
 
 def make_affiliations(
     institutions: Iterable[Institution], authors: Iterable[Author], **context
 ) -> Generator[Affiliation, None, None]:
+    index = XrefIndex(authors, "xref_affiliation", "xref_employment")
+    affiliation_context = Affiliation.clean(context)
+    employment_context = Employment.clean(context)
     for institution in institutions:
-        for author in authors:
-            if author.xref_affiliation & institution.xref:
-                yield Affiliation(
+        for author, (affiliated, employed) in index.match(institution.xref):
+            if affiliated:
+                yield Affiliation.from_clean(
+                    affiliation_context,
                     organization=institution.id,
                     member=author.id,
                     role="AFFILIATION",
-                    **context,
                 )
-            if author.xref_employment & institution.xref:
-                yield Employment(
+            if employed:
+                yield Employment.from_clean(
+                    employment_context,
                     employer=institution.id,
                     employee=author.id,
                     role="EMPLOYMENT",
-                    **context,
                 )
 
 
 def make_authorships(
     article: Article, authors: Iterable[Author]
 ) -> Generator[Documentation, None, None]:
-    context = get_article_context(article.properties)
     for author in authors:
-        yield Documentation(
-            document=article.id, entity=author.id, role="AUTHORSHIP", **context
+        yield Documentation.from_clean(
+            article.documentation_context,
+            document=article.id,
+            entity=author.id,
+            role="AUTHORSHIP",
         )
 
 
@@ -116,8 +160,12 @@ def make_grant_relations(
     authors: Iterable[Author],
     institutions: Iterable[Institution],
     article: Article | None = None,
-    **context
+    **context,
 ):
+    authors_index = XrefIndex(
+        authors, "xref_grant_recipient", "xref_grant_investigator"
+    )
+    institutions_index = XrefIndex(institutions, "xref_grant_funder")
     for grant in grants:
         context = {**grant.properties, **context}
         context.pop("summary", None)
@@ -131,44 +179,43 @@ def make_grant_relations(
                 **context,
             )
 
-        for author in authors:
-            if author.xref_grant_recipient & grant.xref:
-                yield ProjectParticipant(
+        participant_context = ProjectParticipant.clean(context)
+        for author, (recipient, investigator) in authors_index.match(grant.xref):
+            if recipient:
+                yield ProjectParticipant.from_clean(
+                    participant_context,
                     project=grant.id,
                     participant=author.id,
                     role="PARTICIPANT",
-                    **context,
                 )
-            if author.xref_grant_investigator & grant.xref:
-                yield ProjectParticipant(
+            if investigator:
+                yield ProjectParticipant.from_clean(
+                    participant_context,
                     project=grant.id,
                     participant=author.id,
                     role="INVESTIGATOR",
-                    **context,
                 )
 
-        for institution in institutions:
-            if institution.xref_grant_funder & grant.xref:
-                yield ProjectParticipant(
-                    project=grant.id,
-                    participant=institution.id,
-                    role="FUNDER",
-                    **context,
-                )
+        for institution, _ in institutions_index.match(grant.xref):
+            yield ProjectParticipant.from_clean(
+                participant_context,
+                project=grant.id,
+                participant=institution.id,
+                role="FUNDER",
+            )
 
 
 def make_funding_relations(
     institutions: Iterable[Institution],
     article: Article,
 ) -> EGenerator:
-    context = get_article_context(article.properties)
     for institution in institutions:
         if article.xref_funding & institution.xref:
-            yield Documentation(
+            yield Documentation.from_clean(
+                article.documentation_context,
                 entity=institution.id,
                 document=article.id,
                 role="FUNDER",
-                **context,
             )
 
 
@@ -177,76 +224,135 @@ def to_proxies(items: Generator[BaseModel, None, None]) -> EGenerator:
         yield item.proxy
 
 
-def _make_proxies(data: ParsedResult) -> EGenerator:
+def make_statements(data: ParsedResult) -> Generator[BaseModel, None, None]:
+    for key in ("coi_statement", "ack_statement", "funding_statement"):
+        stmt = getattr(data.article, key)
+        if stmt:
+            stmt = Statement(data, bodyText=stmt, title=key.upper())
+            yield stmt
+            yield from stmt.get_documentations()
+
+
+def _make_proxies(data: ParsedResult) -> Generator[EGenerator, None, None]:
     """
     this looks a bit weird but it allows arbitrary parsing from different
     sources (e.g., sometimes with articles, sometimes only authors with or
     without institutions and so on...) and improving context / adjacent data &
     entities during the process
+
+    the entities are generated in steps: ids are namespaced by their step
+    (model class prefixes, identifier schemes and documentation roles), so
+    entities of a finished step don't collide with the following ones. Each
+    step needs to be consumed before the next one.
     """
     context = get_article_context(ensure_dict(data.article))
     if data.journal:
         data.journal = Journal(**data.journal)
-        yield data.journal.proxy
+        yield to_proxies([data.journal])
     if data.institutions:
         data.institutions = [Institution(**i) for i in data.institutions]
-        yield from to_proxies(data.institutions)
+        yield to_proxies(data.institutions)
     if data.authors:
         data.authors = [Author(**i) for i in data.authors]
         data.authors = apply_institution_addresses(data.authors, data.institutions)
         data.authors = merge_authors(data.authors)
-        yield from to_proxies(data.authors)
+        yield to_proxies(data.authors)
     if data.grants:
         data.grants = [Grant(**i) for i in data.grants]
-        yield from to_proxies(data.grants)
+        yield to_proxies(data.grants)
     if data.article:
         data.article = Article(
             data,
             **{**data.article, **{"journal": data.journal, "authors": data.authors}},
         )
-        yield data.article.proxy
+        yield to_proxies([data.article])
         # improve context for later use
         context = get_article_context(data.article.properties)
 
     # relations
     if data.journal and data.article:
-        yield from to_proxies(make_publication(data.journal, data.article))
+        yield to_proxies(make_publication(data.journal, data.article))
     if data.article and data.authors:
-        yield from to_proxies(make_authorships(data.article, data.authors))
+        yield to_proxies(make_authorships(data.article, data.authors))
     if data.institutions and data.authors:
-        yield from to_proxies(
-            make_affiliations(data.institutions, data.authors, **context)
-        )
+        yield to_proxies(make_affiliations(data.institutions, data.authors, **context))
     if data.grants and (data.authors or data.institutions):
-        yield from to_proxies(
+        yield to_proxies(
             make_grant_relations(
                 data.grants, data.authors, data.institutions, data.article, **context
             )
         )
     if data.institutions and data.article:
-        yield from to_proxies(make_funding_relations(data.institutions, data.article))
+        yield to_proxies(make_funding_relations(data.institutions, data.article))
 
     # statements
     if data.article:
-        for key in ("coi_statement", "ack_statement", "funding_statement"):
-            stmt = getattr(data.article, key)
-            if stmt:
-                stmt = Statement(data, bodyText=stmt, title=key.upper())
-                yield stmt.proxy
-                yield from to_proxies(stmt.get_documentations())
+        yield to_proxies(make_statements(data))
+
 
+def get_ner_config(
+    ner: NerConfig | bool | str | Iterable[str] | None = None,
+) -> NerConfig | bool:
+    """
+    configure the ner stage: `True` (all documents), `False` (disabled) or
+    schemata and properties to restrict it to, like `["PlainText",
+    "Article:summary"]`. Strings are booleans or comma separated lists, `None`
+    uses `settings.NER`
+    """
+    if ner is None:
+        ner = settings.NER
+    if isinstance(ner, str):
+        if ner.strip().lower() in ("1", "true", "yes", "on"):
+            return True
+        if ner.strip().lower() in ("", "0", "false", "no", "off"):
+            return False
+        ner = ner.split(",")
+    if isinstance(ner, (bool, dict)):
+        return ner
+    config: NerConfig = {}
+    for value in ner:
+        schema, _, prop = value.strip().partition(":")
+        if model.get(schema) is None:
+            raise TransformException(f"Unknown schema: `{schema}`")
+        if prop:
+            if prop not in model.get(schema).properties:
+                raise TransformException(f"Unknown property: `{value}`")
+            if config.get(schema, set()) is not None:
+                config[schema] = {*config.get(schema, ()), prop}
+        else:
+            config[schema] = None
+    return config or False
+
+
+def make_proxies(
+    data: ParsedResult,
+    dataset: str | None = None,
+    ner: NerConfig | bool | str | Iterable[str] | None = None,
+) -> EGenerator:
+    """
+    ner: see `get_ner_config`, when disabled the ner stack (ingestors, spacy)
+    is not loaded at all
+    """
+    ner = get_ner_config(ner)
+    if ner:
+        from .ner import analyze_many
 
-def make_proxies(data: ParsedResult, dataset: str | None = None) -> EGenerator:
-    proxies: dict[str, CE] = dict()
+        config = ner if isinstance(ner, dict) else None
+        cache = {}
     try:
-        for proxy in _make_proxies(data):
-            for proxy in analyze(proxy):
+        for entities in _make_proxies(data):
+            if ner:
+                entities = analyze_many(entities, config, cache)
+            # merge colliding entities within a step and stream them out
+            # once the step is done
+            proxies: dict[str, CE] = dict()
+            for proxy in entities:
                 if dataset is not None:
                     proxy.datasets.add(dataset)
                 if proxy.id in proxies:
                     proxies[proxy.id].merge(proxy)
                 else:
                     proxies[proxy.id] = proxy
-        yield from proxies.values()
+            yield from proxies.values()
     except Exception as e:
         raise TransformException(e)
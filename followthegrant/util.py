@@ -1,16 +1,33 @@
-from functools import lru_cache
+import re
+from datetime import date
+from functools import cache
 from pathlib import Path
 from typing import Any, Hashable, Iterable
 
-import dateparser
 from banal import ensure_list
 from fingerprints import generate
 from normality import collapse_spaces
 
 from . import settings
+from .cache import SQLiteCache, cached
 
+# `YYYY-MM`, `YYYY-MM-DD` (also not zero padded, like from crossref
+# date-parts) and iso datetimes
+DATE_PATTERN = re.compile(
+    r"(\d{4})-(\d{1,2})(?:-(\d{1,2})"
+    r"(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?)?"
+)
 
-@lru_cache(1_000_000)
+
+@cache
+def get_date_cache() -> SQLiteCache | None:
+    if settings.DATE_CACHE:
+        return SQLiteCache(
+            settings.DATE_CACHE, settings.DATE_CACHE_DB_SIZE, name="clean_date"
+        )
+
+
+@cached("fp", settings.FP_CACHE_SIZE)
 def fp(value: str | None) -> str | None:
     return generate(value)
 
@@ -44,7 +61,25 @@ def get_path(fp: Path | str | None = None) -> Path:
     return settings.DATA_ROOT / fp
 
 
-@lru_cache(1_000_000)
+def parse_date(value: str) -> str | None:
+    """
+    normalize common date formats (see `DATE_PATTERN`) without dateparser,
+    `None` for any other or invalid date. Months stay months (dateparser
+    would add the current day)
+    """
+    match = DATE_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    try:
+        if day is None:
+            return date(int(year), int(month), 1).isoformat()[:7]
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+@cached("clean_date", settings.DATE_CACHE_SIZE, store=get_date_cache)
 def clean_date(value: str | None) -> str | None:
     if value is None:
         return None
@@ -53,6 +88,11 @@ def clean_date(value: str | None) -> str | None:
         return None
     if len(value) == 4:  # year
         return value
+    parsed_value = parse_date(value)
+    if parsed_value:
+        return parsed_value
+    import dateparser  # slow to import
+
     parsed_value = dateparser.parse(value)
     if parsed_value:
         return parsed_value.date().isoformat()
@@ -6,6 +6,7 @@ from structlog import get_logger
 from followthegrant import settings
 
 from .consumer import BatchConsumer, Consumer, basic_publish
+from .publisher import Publisher
 
 log = get_logger(__name__)
 
@@ -14,6 +15,7 @@ class BaseWorker:
     consumer_class = Consumer
     queues = []
     consumer_kwargs = {"prefetch_count": 5}
+    _connection = None
 
     def __init__(self, queues=None):
         self.queues = queues or self.queues
@@ -28,31 +30,98 @@ class BaseWorker:
         self.consumer.run()
 
     def shutdown(self):
-        self.publish_channel.cancel()
-        if self._connection is not None:
+        self.publisher.flush()
+        log.info("Published messages.", **self.publisher.get_stats())
+        if self._connection is not None and self._connection.is_open:
             self._connection.close()
+            while not self._connection.is_closed:
+                self._connection.ioloop.start()  # until `_on_close` stops it
 
     def dispatch(self, queue, payload):
-        basic_publish(queue, payload, self.publish_channel, should_log=True)
+        basic_publish(queue, payload, self.publisher, should_log=True)
+
+    @cached_property
+    def publisher(self):
+        """pipelined publishing with confirms on the `publish_channel`"""
+        channel = self.publish_channel
+        return Publisher(channel, pump=self.pump, wakeup=self._connection.ioloop.stop)
+
+    def pump(self, time_limit=0):
+        """
+        run the ioloop of the publish connection for `time_limit` seconds or
+        until the publisher handled confirms
+        """
+        ioloop = self._connection.ioloop
+        timer = ioloop.call_later(time_limit, ioloop.stop)
+        ioloop.start()
+        ioloop.remove_timeout(timer)
 
     @cached_property
     def publish_channel(self):
-        """a base channel for dispatching without asynchrous consumer running"""
-        connection = pika.BlockingConnection(pika.URLParameters(settings.RABBITMQ_URL))
-        channel = connection.channel()
-        channel.exchange_declare(
-            exchange=settings.EXCHANGE, exchange_type="direct", durable=True
+        """
+        a base channel for dispatching without asynchrous consumer running,
+        the `SelectConnection` ioloop is run until each setup step is done
+        """
+        self._connection = pika.SelectConnection(
+            pika.URLParameters(settings.RABBITMQ_URL),
+            on_open_error_callback=self._on_close,
+            on_close_callback=self._on_close,
+        )
+        self._wait(self._connection.add_on_open_callback)
+        channel = self._wait(
+            lambda callback: self._connection.channel(on_open_callback=callback)
+        )
+        channel.add_on_close_callback(self._on_close)
+        self._wait(
+            lambda callback: channel.exchange_declare(
+                exchange=settings.EXCHANGE,
+                exchange_type="direct",
+                durable=True,
+                callback=callback,
+            )
         )
         for queue in self.queues:
-            channel.queue_declare(
-                queue=queue, durable=True, exclusive=False, auto_delete=False
+            self._wait(
+                lambda callback: channel.queue_declare(
+                    queue=queue,
+                    durable=True,
+                    exclusive=False,
+                    auto_delete=False,
+                    callback=callback,
+                )
             )
-            channel.queue_bind(
-                exchange=settings.EXCHANGE, queue=queue, routing_key=queue
+            self._wait(
+                lambda callback: channel.queue_bind(
+                    queue=queue,
+                    exchange=settings.EXCHANGE,
+                    routing_key=queue,
+                    callback=callback,
+                )
             )
-        self._connection = connection
         return channel
 
+    def _wait(self, start):
+        """
+        start an asynchronous operation, passing it a callback that stops the
+        ioloop, and run the ioloop until then. Returns the callback argument
+        """
+        results = []
+
+        def callback(result):
+            results.append(result)
+            self._connection.ioloop.stop()
+
+        start(callback)
+        self._connection.ioloop.start()
+        if not results:
+            raise self._error
+        return results[0]
+
+    def _on_close(self, _unused, error):
+        # connection or channel closed, or the connection failed to open
+        self._error = error
+        self._connection.ioloop.stop()
+
 
 class BaseBatchWorker(BaseWorker):
     consumer_class = BatchConsumer
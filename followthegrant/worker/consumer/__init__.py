@@ -1,10 +1,10 @@
-import json
 from collections import Counter
 
 import pika
 from structlog import get_logger
 
 from followthegrant import settings
+from followthegrant.serialize import dumps, loads
 
 from ..tasks import QUEUES, TaskAggregator, get_stage
 from .base import ReconnectingPikaConsumer
@@ -13,12 +13,12 @@ from .heartbeat import ReconnectingHeartbeatPikaConsumer
 log = get_logger(__name__)
 
 
-def basic_publish(queue, payload, channel, should_log=False):
+def basic_publish(queue, payload, publisher, should_log=False):
     props = pika.BasicProperties(content_type="application/json", delivery_mode=2)
     if should_log:
         log.info(f'[{payload["dataset"]}] {payload["fpath"]} -> {queue.upper()}')
-    payload = json.dumps(payload, default=lambda x: str(x))
-    msg_size = len(payload.encode("utf-8"))
+    body = dumps(payload)
+    msg_size = len(body)
     if msg_size > 500000000:
         log.error(
             f"Message too large ({msg_size})",
@@ -26,16 +26,13 @@ def basic_publish(queue, payload, channel, should_log=False):
             fpath=payload["fpath"],
         )
     else:
-        try:
-            channel.basic_publish(
-                exchange=settings.EXCHANGE,
-                routing_key=queue,
-                body=payload,
-                mandatory=True,
-                properties=props,
-            )
-        except pika.exceptions.UnroutableError:
-            log.error("Message could not be confirmed", msg=payload)
+        publisher.publish(
+            exchange=settings.EXCHANGE,
+            routing_key=queue,
+            body=body,
+            mandatory=True,
+            properties=props,
+        )
 
 
 class _FTGConsumer:
@@ -43,7 +40,7 @@ class _FTGConsumer:
     MAX_RETRIES = 3
 
     def dispatch(self, queue, payload):
-        basic_publish(queue, payload, self.channel)
+        basic_publish(queue, payload, self.publisher)
 
     def retry_task(self, queue, payload):
         retries = payload.get("retries", 0)
@@ -83,7 +80,7 @@ class Consumer(ReconnectingPikaConsumer, _FTGConsumer):
         """receive a message and handle a task"""
         log.debug("Recieving message", tag=method.delivery_tag)
         queue = method.routing_key
-        payload = json.loads(payload)
+        payload = loads(payload)
         stage = self.get_stage(queue, payload)
         func, *next_queues = self.QUEUES[queue]
         next_queues = self.get_next_queues(payload, next_queues)
@@ -119,7 +116,7 @@ class BatchConsumer(ReconnectingHeartbeatPikaConsumer, _FTGConsumer):
         """receive a message"""
         log.debug("Recieving message", tag=method.delivery_tag)
         queue = method.routing_key
-        payload = json.loads(payload)
+        payload = loads(payload)
         stage = self.get_stage(queue, payload)
         aggregator = self._get_aggregator(stage)
         aggregator.add(method.delivery_tag, payload)
@@ -10,6 +10,8 @@ from pika.exchange_type import ExchangeType
 
 from followthegrant.logging import get_logger
 
+from ..publisher import Publisher
+
 log = get_logger(__name__)
 
 
@@ -49,6 +51,7 @@ class PikaConsumer:
 
         self._connection = None
         self._channel = None
+        self.publisher = None
         self._closing = False
         self._consumer_tags = []
         self._url = amqp_url
@@ -164,6 +167,7 @@ class PikaConsumer:
         """
         log.info("Channel opened")
         self._channel = channel
+        self.publisher = Publisher(channel)
         self.add_on_channel_close_callback()
         self.setup_exchange()
 
@@ -484,6 +488,10 @@ class ReconnectingPikaConsumer(object):
     def channel(self):
         return self._consumer._channel
 
+    @property
+    def publisher(self):
+        return self._consumer.publisher
+
     @property
     def connection(self):
         return self._consumer._connection
@@ -74,7 +74,7 @@ class HeartbeatPikaConsumer(PikaConsumer):
 
     def send_heartbeat(self):
         if self.heartbeat > 0 and self._consuming:
-            self._channel.basic_publish(
+            self.publisher.publish(
                 exchange=self.exchange,
                 routing_key=self.heartbeat_queue,
                 body=str(time.time()),
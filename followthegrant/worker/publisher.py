@@ -0,0 +1,184 @@
+"""
+pipelined publishing with publisher confirms
+
+instead of waiting for the broker after each message, messages are published
+with a sequence number and kept until the broker confirms them. Nacked or
+returned (unroutable) messages are re-published up to `max_retries` times.
+"""
+
+import time
+from collections import Counter
+from copy import copy
+from typing import Callable, NamedTuple
+
+import pika
+from pika.channel import Channel
+
+from followthegrant import settings
+from followthegrant.logging import get_logger
+
+log = get_logger(__name__)
+
+# publish sequence number (= delivery tag) of a message, to match returns
+SEQ_HEADER = "x-publish-seq"
+
+
+class Message(NamedTuple):
+    exchange: str
+    routing_key: str
+    body: bytes
+    properties: pika.BasicProperties
+    mandatory: bool
+    retries: int
+
+
+class Publisher:
+    """
+    publish to a (asynchronous) pika channel with confirms enabled, keeping
+    track of the outstanding messages by their delivery tag
+
+    when publishing from outside of the connections ioloop, pass a `pump` that
+    runs the ioloop for at most `time_limit` seconds and a `wakeup` that stops
+    it (called after confirms were handled): then at most `window` messages
+    are in flight, `publish` waits for confirms when the window is full.
+    Within the ioloop of a `SelectConnection` we can't block, so the window is
+    not enforced there (the consumers prefetch count limits it anyways).
+    """
+
+    def __init__(
+        self,
+        channel: Channel,
+        window: int | None = None,
+        max_retries: int | None = None,
+        pump: Callable[..., None] | None = None,
+        wakeup: Callable[[], None] | None = None,
+    ):
+        self.channel = channel
+        self.window = window or settings.PUBLISH_WINDOW
+        if max_retries is None:
+            max_retries = settings.PUBLISH_MAX_RETRIES
+        self.max_retries = max_retries
+        self.pump = pump
+        self.wakeup = wakeup
+        self.seq = 0
+        self.pending: dict[int, Message] = {}
+        self.returned: set[int] = set()
+        self.counts = Counter()
+        self.started = time.time()
+        channel.confirm_delivery(self.on_confirm)
+        channel.add_on_return_callback(self.on_return)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        body: bytes,
+        properties: pika.BasicProperties | None = None,
+        mandatory: bool | None = True,
+        retries: int | None = 0,
+    ) -> None:
+        if self.pump is not None:
+            while len(self.pending) >= self.window:
+                self.pump(time_limit=1)
+        self.send(
+            Message(
+                exchange,
+                routing_key,
+                body,
+                properties or pika.BasicProperties(),
+                mandatory,
+                retries,
+            )
+        )
+        if self.pump is not None:
+            self.pump(time_limit=0)
+        if self.counts["published"] % 10_000 == 0:
+            log.info("Publishing ...", **self.get_stats())
+
+    def send(self, message: Message) -> None:
+        self.seq += 1
+        # don't touch the callers properties, they are re-used for retries
+        properties = copy(message.properties)
+        properties.headers = {**(properties.headers or {}), SEQ_HEADER: self.seq}
+        self.pending[self.seq] = message
+        self.channel.basic_publish(
+            exchange=message.exchange,
+            routing_key=message.routing_key,
+            body=message.body,
+            properties=properties,
+            mandatory=message.mandatory,
+        )
+        self.counts["published"] += 1
+
+    def on_confirm(self, frame: pika.frame.Method) -> None:
+        method = frame.method
+        tag = method.delivery_tag
+        if method.multiple:
+            tags = []
+            for pending_tag in self.pending:
+                if pending_tag > tag:
+                    break
+                tags.append(pending_tag)
+        else:
+            tags = [tag]
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        for tag in tags:
+            message = self.pending.pop(tag, None)
+            if message is None:
+                continue
+            if tag in self.returned:
+                self.returned.discard(tag)
+                self.retry(message, "returned")
+            elif acked:
+                self.counts["confirmed"] += 1
+            else:
+                self.retry(message, "nacked")
+        if self.wakeup is not None:
+            self.wakeup()
+
+    def on_return(
+        self,
+        channel: Channel,
+        method: pika.spec.Basic.Return,
+        properties: pika.BasicProperties,
+        body: bytes,
+    ) -> None:
+        # the broker sends the return before the ack of the same message
+        seq = (properties.headers or {}).get(SEQ_HEADER)
+        if seq is not None:
+            self.returned.add(seq)
+
+    def retry(self, message: Message, reason: str) -> None:
+        self.counts[reason] += 1
+        if message.retries < self.max_retries:
+            # don't wait here, we are called from within the connections ioloop
+            self.counts["republished"] += 1
+            self.send(message._replace(retries=message.retries + 1))
+        else:
+            self.counts["failed"] += 1
+            log.error(
+                f"Message {reason} after {message.retries} retries",
+                routing_key=message.routing_key,
+                size=len(message.body),
+            )
+
+    def flush(self, timeout: float | None = 60) -> None:
+        """wait until all outstanding messages are confirmed"""
+        if self.pump is None:
+            return
+        started = time.time()
+        while self.pending and time.time() - started < timeout:
+            self.pump(time_limit=1)
+        if self.pending:
+            log.warning(f"{len(self.pending)} messages not confirmed", timeout=timeout)
+
+    def get_stats(self) -> dict[str, int | float]:
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {
+            **self.counts,
+            "outstanding": len(self.pending),
+            "msgs_per_sec": round(self.counts["published"] / elapsed, 2),
+        }
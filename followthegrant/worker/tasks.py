@@ -1,6 +1,7 @@
 import os
 import time
 from functools import cached_property, lru_cache
+from typing import Any, Generator, Iterable
 
 from followthemoney.util import make_entity_id
 from structlog import get_logger
@@ -8,6 +9,7 @@ from structlog import get_logger
 from followthegrant import settings
 from followthegrant.dedupe import explode_triples
 from followthegrant.parse import parse
+from followthegrant.serialize import dumps, fragment
 from followthegrant.store import get_dataset, get_store
 from followthegrant.transform import make_proxies
 from followthegrant.util import get_path
@@ -46,14 +48,49 @@ AUTHOR_TRIPLES = "author-triples"
 WRITE_AUTHOR_TRIPLES = "write-author-triples"
 
 
+def batch_payloads(
+    payload: dict[str, Any],
+    items: Iterable[Any],
+    max_items: int | None = None,
+    max_bytes: int | None = None,
+) -> Generator[dict[str, Any], None, None]:
+    """
+    pack items into copies of `payload` (as `data`) until the batch reaches
+    `max_items` or its serialized size would exceed `max_bytes`, to stay
+    below the rabbitmq message size limit. Items larger than `max_bytes` are
+    emitted on their own.
+
+    The items are serialized once to measure them and packed as json
+    fragments, so `dumps` of the batch doesn't serialize them again.
+    """
+    max_items = max_items or settings.PARSE_BATCH_SIZE
+    max_bytes = max_bytes or settings.PARSE_BATCH_BYTES
+    base_size = len(dumps({**payload, "data": []}))
+    batch, size = [], base_size
+    for item in items:
+        item = dumps(item)
+        item_size = len(item) + 1  # separator
+        if batch and size + item_size > max_bytes:
+            yield {**payload, "data": batch}
+            batch, size = [], base_size
+        batch.append(fragment(item))
+        size += item_size
+        if len(batch) >= max_items:
+            yield {**payload, "data": batch}
+            batch, size = [], base_size
+    if batch:
+        yield {**payload, "data": batch}
+
+
 def op_parse(payload):
     parser = payload["parser"]
     dataset = payload["dataset"]
     fpath = get_path(payload["fpath"])
-    # some entities are a lot of json data, so we emit them 1 by 1 to avoid
+    # some entities are a lot of json data, so we batch them by size to avoid
     # rabbitmq message size limit
-    for proxy in parse(fpath, parser, dataset):
-        yield {**payload, **{"data": [proxy.to_dict()]}}
+    ner = payload.get("ner")
+    entities = (proxy.to_dict() for proxy in parse(fpath, parser, dataset, ner))
+    yield from batch_payloads(payload, entities)
 
 
 def op_delete_source(payload):
@@ -104,6 +141,7 @@ class TaskAggregator:
         self.consumer = consumer
         self.stage = stage
         self.tasks = []
+        self.size = 0
         func, batch_size, *next_queues = QUEUES[stage.queue]
         self.func = func
         self.batch_size = batch_size
@@ -113,6 +151,8 @@ class TaskAggregator:
 
     def add(self, tag, payload):
         self.tasks.append((tag, payload))
+        # batch size counts the items, as a message can contain many of them
+        self.size += max(len(payload.get("data", ())), 1)
         self.last_activity = time.time()
         self.flush()
 
@@ -169,6 +209,7 @@ class TaskAggregator:
 
             # reset basket
             self.tasks = []
+            self.size = 0
             self.is_flushing = False
             self.last_activity = time.time()
 
@@ -187,7 +228,7 @@ class TaskAggregator:
             return False
         if not self.consumer.is_active:
             return False
-        if len(self.tasks) >= self.batch_size:
+        if self.size >= self.batch_size:
             return True
         if time.time() - self.last_activity > 5:
             return True
@@ -0,0 +1,71 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from followthegrant.cache import SQLiteCache, cached, get_cache_stats
+
+
+class CacheTestCase(TestCase):
+    def test_sqlite_cache(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cache.db"
+            cache = SQLiteCache(path, max_size=10)
+            self.assertIsNone(cache.get("a"))
+            cache.set("a", [["eng"], [["Analyzable:companiesMentioned", "ACME"]]])
+            self.assertEqual(
+                cache.get("a"), [["eng"], [["Analyzable:companiesMentioned", "ACME"]]]
+            )
+            self.assertEqual(cache.get("b", "default"), "default")
+
+            # replacing a value doesn't count as a new entry
+            cache.set("b", 1)
+            cache.set("b", 2)
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(cache.get("b"), 2)
+
+            # least recently used entries are evicted
+            for i in range(10):
+                cache.set(str(i), i)
+                cache.get("a")
+            self.assertLessEqual(len(cache), 10)
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNone(cache.get("0"))
+            self.assertEqual(cache.get("9"), 9)
+
+            stats = cache.get_stats()
+            self.assertEqual(stats["hits"], 14)
+            self.assertEqual(stats["misses"], 3)
+            self.assertEqual(stats["evictions"], 2)
+            cache.close()
+
+            # persisted
+            cache = SQLiteCache(path, max_size=10)
+            self.assertEqual(len(cache), 10)
+            self.assertEqual(cache.get("9"), 9)
+            cache.close()
+
+    def test_cached(self):
+        calls = []
+
+        with TemporaryDirectory() as tmp:
+            store = SQLiteCache(Path(tmp) / "cache.db", max_size=10)
+
+            @cached("test_cached", 2, store=lambda: store)
+            def upper(value):
+                calls.append(value)
+                return value.upper()
+
+            self.assertEqual(upper("a"), "A")
+            self.assertEqual(upper("a"), "A")
+            self.assertEqual(upper("b"), "B")
+            self.assertEqual(upper("c"), "C")  # evicts "a"
+            self.assertEqual(upper("a"), "A")  # from the store
+            self.assertEqual(calls, ["a", "b", "c"])
+            self.assertEqual(store.get("test_cached:a"), "A")
+            store.close()
+
+        stats = get_cache_stats()["test_cached"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["size"], 2)
@@ -0,0 +1,100 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from click.testing import CliRunner
+
+from followthegrant import coi
+from followthegrant.cli import cli
+
+# articles without random (uuid) ids, so that the output of several runs is equal
+PUBMED = (
+    "0036-4665-rimtsp-56-02-179.nxml",
+    "10753_2004_Article_379072.nxml",
+    "10815_2017_Article_1073.nxml",
+    "11060_2018_Article_2949.nxml",
+    "12872_2018_Article_766.nxml",
+    "12877_2019_Article_1279.nxml",
+    "12885_2019_Article_5936.nxml",
+    "12891_2017_Article_1891.nxml",
+)
+
+
+def parse(paths: list[str], parser: str, *args: str) -> list[str]:
+    with tempfile.TemporaryDirectory() as tmp:
+        outfile = Path(tmp) / "entities.ijson"
+        res = CliRunner().invoke(
+            cli,
+            ["parse", parser, "--no-ner", "-o", str(outfile), *args],
+            input="\n".join(paths) + "\n",
+        )
+        assert res.exit_code == 0, res.output
+        return [normalize(line) for line in outfile.read_bytes().splitlines()]
+
+
+def normalize(line: bytes) -> str:
+    # property values are sets, their order differs between processes
+    data = json.loads(line)
+    data["properties"] = {k: sorted(v) for k, v in data["properties"].items()}
+    return json.dumps(data, sort_keys=True)
+
+
+class CliTestCase(TestCase):
+    def test_parse_workers(self):
+        paths = [str(Path("testdata/pubmed") / name) for name in PUBMED]
+        lines = parse(paths, "jats")
+        self.assertTrue(len(lines))
+        self.assertEqual(parse(paths, "jats", "--workers", "2", "--ordered"), lines)
+        self.assertEqual(
+            sorted(parse(paths, "jats", "--workers", "2", "--unordered")),
+            sorted(lines),
+        )
+
+    def test_parse_workers_partial(self):
+        """entities parsed before an error are written in both modes"""
+        fpath = Path("testdata/europepmc/PMC1054879_PMC1059452.xml.gz")
+        with tempfile.TemporaryDirectory() as tmp:
+            truncated = Path(tmp) / fpath.name
+            truncated.write_bytes(fpath.read_bytes()[:100_000])
+            paths = [str(fpath), str(truncated)]
+            lines = parse(paths, "europepmc")
+            lines_workers = parse(paths, "europepmc", "--workers", "2", "--ordered")
+            lines_full = parse(paths[:1], "europepmc")
+        self.assertEqual(lines_workers, lines)
+        self.assertGreater(len(lines), len(lines_full))
+        self.assertLess(len(lines), 2 * len(lines_full))
+
+    def test_flag_cois_errors(self):
+        """failing rows are logged and skipped, in both modes"""
+        flag_coi = coi.FLAGGERS["rtrans"]
+
+        def flag(text):
+            if text == "fail":
+                raise ValueError(text)
+            return flag_coi(text)
+
+        rows = "The authors declare no conflicts,a\nfail,b\nKA is employed by ACME,c\n"
+        expected = "The authors declare no conflicts,0,a\nKA is employed by ACME,1,c\n"
+        flagger = mock.patch.dict(coi.FLAGGERS, {"rtrans": flag})
+        with flagger, tempfile.TemporaryDirectory() as tmp:
+            outfile = Path(tmp) / "flagged.csv"
+            for args in ([], ["--workers", "2", "--chunk-size", "1"]):
+                res = CliRunner().invoke(
+                    cli,
+                    ["flag-cois", "-m", "rtrans", "-o", str(outfile), *args],
+                    input=rows,
+                )
+                self.assertEqual(res.exit_code, 0, res.output)
+                self.assertEqual(outfile.read_text(), expected)
+
+    def test_ner_options(self):
+        res = CliRunner().invoke(
+            cli, ["parse", "jats", "--no-ner", "--ner-only", "Article"], input=""
+        )
+        self.assertEqual(res.exit_code, 2)
+        self.assertIn("--no-ner", res.output)
+        res = CliRunner().invoke(
+            cli, ["parse", "jats", "--ner-only", "Foo:bar"], input=""
+        )
+        self.assertEqual(res.exit_code, 2)
@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from ftg import coi
+from followthegrant import coi
 
 
 class ModelTestCase(TestCase):
@@ -38,6 +38,66 @@ class ModelTestCase(TestCase):
             stmt = f"{name} has one."
             self.assertTrue(coi._test_sentence(stmt, tests))
 
+    def test_author_matcher(self):
+        authors = (("Paula Theda", "Anderson"), ("Lisa", "Smith"), ("Alice", "Mueller"))
+        matcher = coi.AuthorMatcher(
+            {author: list(coi._get_author_tests(author)) for author in authors}
+        )
+        self.assertListEqual(
+            matcher.match("L. Smith and P.T.A. are employees of Bayer."),
+            [("Paula Theda", "Anderson"), ("Lisa", "Smith")],
+        )
+        self.assertListEqual(matcher.match("The funders had no role."), [])
+
+        # the anchor prefilter doesn't change the result of testing each author
+        authors = (*authors, ("K.", "Smith"), ("Jean-Luc", "O'Neill"), ("Xi", "Li"))
+        tests = {author: list(coi._get_author_tests(author)) for author in authors}
+        matcher = coi.AuthorMatcher(tests)
+        with open("./testdata/medrxiv_cois.txt") as f:
+            texts = f.readlines()[:300]
+        texts.append("JLO, LS and X.L. declare that Alice Mueller has no interests.")
+        matches = 0
+        for text in texts:
+            expected = [a for a in authors if coi._test_sentence(text, tests[a])]
+            self.assertListEqual(matcher.match(text), expected)
+            matches += bool(expected)
+        self.assertGreater(matches, 1)
+
+    def test_split_sentences(self):
+        text = (
+            "Competing Interests: KMS is an employee of Verseon Corp. and holds "
+            "stock. Dr. Smith (U.S. Department of Health) received fees from "
+            "Pfizer Inc. Ltd. Are there others? Yes, see the appendix (Table 1.). "
+            '"P.T.A. has none."'
+        )
+        spacy = list(coi.split_sentences(text, "spacy"))
+        self.assertListEqual(list(coi.split_sentences(text, "regex")), spacy)
+        self.assertEqual(len(spacy), 6)
+        # abbreviations, initials, acronyms, ellipsis and trailing punctuation
+        cases = {
+            "See e.g. the appendix. Nothing else.": 2,
+            "He met Prof. Smith in Jan. and Mar. Then he left.": 1,
+            "Funding by A. B. Smith. The rest is none.": 2,
+            "Made in the USA. Sold in Europe.": 2,
+            "Wait... nothing more. Done.": 2,
+            "It grew 5%. It fell.": 2,
+            "Really?! Yes.": 2,
+            'He said "none." She agreed.': 2,
+            "The NIH (grant 12.) funded it. Done!": 3,
+        }
+        for text, n in cases.items():
+            spacy = list(coi.split_sentences(text, "spacy"))
+            self.assertListEqual(list(coi.split_sentences(text, "regex")), spacy)
+            self.assertEqual(len(spacy), n, text)
+        with open("./testdata/medrxiv_cois.txt") as f:
+            texts = [" ".join(line.split()) for line in f.readlines()[:500]]
+        agree = sum(
+            list(coi.split_sentences(t, "spacy"))
+            == list(coi.split_sentences(t, "regex"))
+            for t in texts
+        )
+        self.assertGreater(agree / len(texts), 0.97)
+
     def test_coi_split_all_authors_nothing(self):
         statement = "The authors declare nothing."
         authors = (("Paula Theda", "Anderson"), ("Lisa", "Smith"))
@@ -147,6 +207,19 @@ class ModelTestCase(TestCase):
             res,
         )
 
+    def test_coi_split_long_statement(self):
+        # many consecutive sentences with authors don't hit the recursion limit
+        statement = " ".join(
+            ["Paula Anderson has a conflict.", "Lisa Smith has a conflict."] * 1000
+        )
+        authors = (("Paula Theda", "Anderson"), ("Lisa", "Smith"), ("Alice", "Mueller"))
+        res = coi.split_coi(statement + " All remaining authors have none.", authors)
+        self.assertEqual(len(res[("Paula Theda", "Anderson")]), 1000)
+        self.assertEqual(len(res[("Lisa", "Smith")]), 1000)
+        self.assertEqual(
+            res[("Alice", "Mueller")], ["All remaining authors have none."]
+        )
+
     def test_coi_split_remaining_authors(self):
         statement = """Competing Interests: MS, MR, KL, MAE,
             KMS, DCW, AD, and DBK are employees of Verseon Corporation. EDC
@@ -309,3 +382,81 @@ class ModelTestCase(TestCase):
             coi.flag_coi(text)
             coi.flag_coi_rtrans(text)
             coi.flag_coi_hristio(text)
+
+    def test_flag_cois(self):
+        from normality import normalize
+
+        with open("./testdata/medrxiv_cois.txt") as f:
+            cois = f.readlines()
+        for text in cois:
+            self.assertEqual(coi.normalize(text), normalize(text))
+
+        methods = ("ftg", "rtrans", "hristio")
+        res = list(coi.flag_cois(cois, methods))
+        self.assertEqual(len(res), len(cois))
+        for text, flags in zip(cois, res):
+            self.assertEqual(
+                flags,
+                (
+                    coi.flag_coi(text),
+                    coi.flag_coi_rtrans(text),
+                    coi.flag_coi_hristio(text),
+                ),
+            )
+        self.assertEqual(
+            list(coi.flag_cois(cois, ("hristio",))), [(f[2],) for f in res]
+        )
+        self.assertEqual(list(coi.flag_cois(["", "none"])), [(False,), (False,)])
+        flag = coi.get_flagger(methods)
+        self.assertEqual([flag(text) for text in cois[:100]], res[:100])
+        with self.assertRaises(ValueError):
+            list(coi.flag_cois(cois, ("foo",)))
+        with self.assertRaises(ValueError):
+            coi.get_flagger(("foo",))
+
+    def test_extract_coi_from_tree(self):
+        from lxml import etree
+
+        tree = etree.fromstring(
+            """<article><body><sec><title>Competing interests</title>
+            <p>KA is an <italic>employee</italic> of ACME.</p><p>Other text</p>
+            </sec></body></article>"""
+        )
+        self.assertEqual(
+            coi.extract_coi_from_tree(tree),
+            "Competing interests KA is an employee of ACME.",
+        )
+        tree = etree.fromstring(
+            """<article><back><fn-group><fn><p><bold>Conflict of Interest:</bold>
+            None declared.</p></fn><fn><p>Source of funding: none</p></fn>
+            </fn-group></back></article>"""
+        )
+        self.assertEqual(
+            coi.extract_coi_from_tree(tree), "Conflict of Interest: None declared."
+        )
+        tree = etree.fromstring(
+            """<article><back><notes><p>The authors declare no competing
+            interests.</p></notes></back></article>"""
+        )
+        self.assertEqual(
+            coi.extract_coi_from_tree(tree),
+            "The authors declare no competing\n            interests.",
+        )
+        # the references following the statement are excluded
+        tree = etree.fromstring(
+            """<article><back><sec><title>Competing interests</title>
+            <p>None declared.</p></sec><ref-list><title>References</title>
+            <ref id="r1"><mixed-citation>Smith J. Funding by industry.
+            </mixed-citation></ref></ref-list></back></article>"""
+        )
+        self.assertEqual(
+            coi.extract_coi_from_tree(tree), "Competing interests None declared."
+        )
+        tree = etree.fromstring(
+            """<article><back><notes><title>Competing interests</title></notes>
+            <ref-list><ref id="r1"><mixed-citation>Smith J. Funding by industry.
+            </mixed-citation></ref></ref-list></back></article>"""
+        )
+        self.assertEqual(coi.extract_coi_from_tree(tree), "Competing interests")
+        tree = etree.fromstring("<article><p>Nothing here.</p></article>")
+        self.assertIsNone(coi.extract_coi_from_tree(tree))
@@ -0,0 +1,119 @@
+import csv
+from collections import defaultdict
+from unittest import TestCase, mock
+
+from followthegrant import dedupe
+from followthegrant.exceptions import DedupeException
+
+
+class DedupeTriplesTestCase(TestCase):
+    def test_dedupe_triples(self):
+        # all alices are the same alice
+        triples = (
+            ("id1", "AFFILIATION", "institute 1"),
+            ("id2", "AFFILIATION", "institute 1"),
+            ("id2", "AFFILIATION", "institute 2"),
+            ("id3", "AFFILIATION", "institute 2"),
+            ("id3", "AUTHORSHIP", "article 1"),
+            ("id4", "AUTHORSHIP", "article 1"),
+            ("id5", "AUTHORSHIP", "article 2"),
+        )
+        res = list(dedupe.dedupe_triples(triples))
+        self.assertSequenceEqual(
+            sorted(res),
+            [("id1", "id1"), ("id1", "id2"), ("id1", "id3"), ("id1", "id4")],
+        )
+
+        # same target in different relations is not a match
+        triples = (
+            ("id1", "AFFILIATION", "x"),
+            ("id2", "EMPLOYMENT", "x"),
+            ("id3", "doi", "y"),
+            ("id4", "doi", "y"),
+        )
+        res = list(dedupe.dedupe_triples(triples))
+        self.assertSequenceEqual(sorted(res), [("id3", "id3"), ("id3", "id4")])
+
+    def test_dedupe_triples_real_world(self):
+        with open("./testdata/author_triples.txt") as f:
+            reader = csv.reader(f, delimiter="\t")
+            # fingerprint,author_id,value_id -> author_id,fingerprint,value_id
+            triples = [(r[1], r[0], r[2]) for r in reader]
+
+        res = list(dedupe.dedupe_triples(triples))
+        self.assertEqual(len(res), 1114)
+        canonicals = set(r[0] for r in res)
+        for canonical, member in res:
+            self.assertLessEqual(canonical, member)
+            self.assertIn(canonical, canonicals)
+
+    def test_dedupe_sorted_triples(self):
+        with open("./testdata/author_triples.txt") as f:
+            reader = csv.reader(f, delimiter="\t")
+            triples = [(r[1], r[0], r[2]) for r in reader]
+
+        expected = sorted(dedupe.dedupe_triples(triples))
+
+        # external sort with spilled chunks
+        sorted_triples = list(dedupe.sort_triples(triples, chunk_size=1000))
+        self.assertEqual(len(sorted_triples), len(triples))
+        self.assertEqual(
+            sorted_triples, sorted(sorted_triples, key=lambda t: (t[1], t[2]))
+        )
+        res = sorted(dedupe.dedupe_sorted_triples(sorted_triples))
+        self.assertSequenceEqual(res, expected)
+
+        # in memory sort for small input
+        res = dedupe.dedupe_sorted_triples(dedupe.sort_triples(triples))
+        self.assertSequenceEqual(sorted(res), expected)
+
+        with self.assertRaises(DedupeException):
+            list(dedupe.dedupe_sorted_triples(triples))
+
+    def test_union_find(self):
+        components = dedupe.UnionFind()
+        components.union("a", "b")
+        components.union("c", "d")
+        components.union("b", "d")
+        components.find("e")
+        self.assertEqual(len(components), 5)
+        self.assertEqual(components.find("a"), components.find("c"))
+        self.assertNotEqual(components.find("a"), components.find("e"))
+        self.assertEqual(
+            sorted(sorted(c) for c in components.components()),
+            [["a", "b", "c", "d"], ["e"]],
+        )
+
+    def test_dedupe_from_db_parallel(self):
+        # fingerprint,author_id,value_id
+        with open("./testdata/author_triples.txt") as f:
+            big = {tuple(r[:3]) for r in csv.reader(f, delimiter="\t")}
+        triples = set()
+        for ix in range(3):  # packs above the slow lane threshold
+            triples.update((f"{fp}{ix}", f"{a}{ix}", v) for fp, a, v in big)
+        for ix in range(20):
+            triples.update(
+                (
+                    (f"fp{ix}", f"a{ix}", "x"),
+                    (f"fp{ix}", f"b{ix}", "x"),
+                    (f"fp{ix}", f"c{ix}", "y"),
+                )
+            )
+        packs = defaultdict(set)
+        for triple in triples:
+            packs[triple[0]].add(triple)
+        store = mock.Mock()
+        store.iterate_triple_packs.side_effect = lambda dataset: iter(packs.values())
+
+        expected = sorted(dedupe.dedupe_triples((a, fp, v) for fp, a, v in triples))
+        self.assertEqual(len(expected), 3 * 1114 + 20 * 2)
+        pairs, candidates, _ = dedupe.dedupe_pack(big)
+        self.assertEqual(len(pairs), 1114)
+        self.assertEqual(candidates, len({t[1] for t in big}))
+
+        with mock.patch.object(dedupe, "get_store", return_value=store):
+            self.assertSequenceEqual(sorted(dedupe.dedupe_from_db()), expected)
+            res = dedupe.dedupe_from_db_parallel(
+                workers=2, max_in_flight=2, slow_lane_threshold=100
+            )
+            self.assertSequenceEqual(sorted(res), expected)
@@ -0,0 +1,69 @@
+import gzip
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+from followthegrant.coi import extract_coi_from_tree
+from followthegrant.parse.parsers.europepmc import iter_articles
+
+ARTICLE = """<article>
+  <front><article-meta>
+    <article-id pub-id-type="pmc">{ix}</article-id>
+    <title-group><article-title>Article {ix}</article-title></title-group>
+  </article-meta></front>
+  <body><p>{body}</p></body>
+</article>
+"""
+
+
+def get_rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class EuropePmcTestCase(TestCase):
+    def test_iter_articles(self):
+        fpath = Path("./testdata/europepmc/PMC1054879_PMC1059452.xml.gz")
+        articles = [el.findtext(".//article-id") for el in iter_articles(fpath)]
+        self.assertTrue(len(articles))
+        self.assertEqual(len(articles), len(set(articles)))
+
+    def test_coi_heading_last_element(self):
+        """expanding a coi heading stops at the end of its article"""
+        coi = "</body><back><sec><title>Competing interests</title></sec></back>"
+        first = ARTICLE.format(ix=0, body="First").replace("</body>", coi)
+        with tempfile.TemporaryDirectory() as tmp:
+            fpath = Path(tmp) / "articles.xml.gz"
+            with gzip.open(fpath, "wt") as f:
+                f.write("<articles>\n")
+                f.write(first)
+                f.write(ARTICLE.format(ix=1, body="The authors declare none."))
+                f.write("</articles>\n")
+            cois = [extract_coi_from_tree(el) for el in iter_articles(fpath)]
+        self.assertEqual(cois, ["Competing interests", None])
+
+    @skipUnless(os.path.exists("/proc/self/statm"), "needs procfs")
+    def test_iter_articles_memory(self):
+        """peak memory doesn't grow with the (decompressed) file size"""
+        n_articles = 20_000
+        body = "lorem ipsum dolor sit amet " * 100
+        with tempfile.TemporaryDirectory() as tmp:
+            fpath = Path(tmp) / "articles.xml.gz"
+            with gzip.open(fpath, "wt") as f:
+                f.write("<articles>\n")
+                for ix in range(n_articles):
+                    f.write(ARTICLE.format(ix=ix, body=body))
+                f.write("</articles>\n")
+            size = n_articles * len(body)  # > 50 MB
+
+            base = get_rss()
+            peak = base
+            ix = 0
+            for ix, el in enumerate(iter_articles(fpath), 1):
+                self.assertEqual(el.findtext(".//article-id"), str(ix - 1))
+                if ix % 1000 == 0:
+                    peak = max(peak, get_rss())
+
+        self.assertEqual(ix, n_articles)
+        self.assertLess(peak - base, size / 5)
@@ -0,0 +1,55 @@
+import csv
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from followthegrant.intern import StringTable, TripleTable
+
+
+class InternTestCase(TestCase):
+    def test_string_table(self):
+        strings = StringTable()
+        self.assertEqual(strings.add("doi-10.1101-1"), 0)
+        self.assertEqual(strings.add("doi-10.1101-2"), 1)
+        self.assertEqual(strings.add("doi-10.1101-1"), 0)
+        self.assertEqual(len(strings), 2)
+        self.assertEqual(strings[1], "doi-10.1101-2")
+        self.assertIn("doi-10.1101-2", strings)
+        self.assertIsNone(strings.get("doi-10.1101-3"))
+
+    def test_triple_table(self):
+        with open("./testdata/author_triples.txt") as f:
+            reader = csv.reader(f, delimiter="\t")
+            triples = [(r[1], r[0], r[2]) for r in reader]
+
+        table = TripleTable()
+        table.extend(triples)
+        self.assertEqual(len(table), len(triples))
+        self.assertEqual(table.to_numpy().shape, (len(triples), 3))
+        self.assertListEqual(list(table), triples)
+
+        # memory mapped
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "triples.bin"
+            mapped = TripleTable(path=path, buffer_size=1000)
+            mapped.extend(triples)
+            mapped.close()
+            self.assertEqual(path.stat().st_size, len(triples) * 3 * 4)
+            self.assertListEqual(list(mapped), triples)
+            self.assertListEqual(
+                sorted(mapped.shared_pairs()), sorted(table.shared_pairs())
+            )
+
+    def test_shared_pairs(self):
+        table = TripleTable()
+        table.extend(
+            (
+                ("a", "AFFILIATION", "x"),
+                ("b", "AFFILIATION", "x"),
+                ("c", "AFFILIATION", "x"),
+                ("a", "AFFILIATION", "y"),
+                ("d", "EMPLOYMENT", "x"),
+            )
+        )
+        pairs = [(table.strings[a], table.strings[b]) for a, b in table.shared_pairs()]
+        self.assertListEqual(sorted(pairs), [("a", "b"), ("a", "c")])
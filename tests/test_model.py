@@ -327,3 +327,22 @@ class ModelTestCase(TestCase):
             ),
             "a9090414a28a7fefc37335edb92d46f07ac99582",
         )
+
+    def test_schema_model_fields(self):
+        from followthegrant.ftm import SchemaModel, Values
+
+        class Thing(SchemaModel):
+            name: Values = set()  # evaluated annotation
+            summary: "Values"  # string annotation, e.g. in postponed evaluation
+            other: str = "foo"
+
+        class Other(Thing):
+            _fields = frozenset(("notes",))
+
+        self.assertEqual(Thing._fields, {"name", "summary"})
+        self.assertEqual(Other._fields, {"name", "summary", "notes"})
+        thing = Thing(name="a", summary=["b"], other="c")
+        self.assertEqual(thing.name, {"a"})
+        self.assertEqual(thing.summary, {"b"})
+        self.assertEqual(thing.other, "foo")
+        self.assertTrue({"xref", "ident"} <= model.Author._fields)
@@ -0,0 +1,148 @@
+import importlib
+import sys
+from collections import defaultdict
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from followthemoney import model
+
+import followthegrant
+from followthegrant.cache import SQLiteCache
+
+COMPANIES = model.get_qname("Analyzable:companiesMentioned")
+
+
+class TagAggregator:
+    def __init__(self):
+        self.values = defaultdict(list)
+
+    def add(self, prop, value):
+        self.values[(value.lower(), prop)].append(value)
+
+    def results(self):
+        for (key, prop), values in self.values.items():
+            yield key, prop, values
+
+
+def text_chunks(texts):
+    for text in texts:
+        yield from text.splitlines()
+
+
+def detect_languages(entity, text):
+    entity.add("detectedLanguage", "eng")
+
+
+def extract_entities(entity, text):
+    for word in text.split():
+        if word.isupper():
+            yield COMPANIES, word
+
+
+def load_ner():
+    """import `followthegrant.ner` without the ingestors and fasttext stack"""
+    analysis = mock.MagicMock()
+    analysis.Analyzer.MENTIONS = {COMPANIES: "Organization"}
+    modules = {
+        "fasttext": mock.MagicMock(),
+        "ingestors": mock.MagicMock(),
+        "ingestors.analysis": analysis,
+        "ingestors.analysis.aggregate": mock.MagicMock(TagAggregator=TagAggregator),
+        "ingestors.analysis.extract": mock.MagicMock(),
+        "ingestors.analysis.language": mock.MagicMock(),
+        "ingestors.analysis.util": mock.MagicMock(
+            DOCUMENT="Document", text_chunks=text_chunks
+        ),
+    }
+    loaded = getattr(followthegrant, "ner", None)
+    with mock.patch.dict(sys.modules, modules):
+        sys.modules.pop("followthegrant.ner", None)
+        ner = importlib.import_module("followthegrant.ner")
+    # don't leak the mocked module to other tests
+    if loaded is None:
+        del followthegrant.ner
+    else:
+        followthegrant.ner = loaded
+    return ner
+
+
+def make_entities():
+    entities = [
+        model.make_entity("PlainText"),
+        model.make_entity("PlainText"),
+        model.make_entity("Person"),
+    ]
+    for i, entity in enumerate(entities):
+        entity.id = str(i)
+    # the first chunks only differ in whitespace
+    entities[0].add("bodyText", "Fees from ACME  and BIGCO.\nNothing else.")
+    entities[1].add("bodyText", "Fees from ACME and BIGCO.\nGrant by XYZ.")
+    return entities
+
+
+def get_mentions(proxies):
+    names = defaultdict(set)
+    for proxy in proxies:
+        if proxy.schema.name == "Mention":
+            names[proxy.first("document")].update(proxy.get("name"))
+    return names
+
+
+class NerCacheTestCase(TestCase):
+    def setUp(self):
+        self.ner = load_ner()
+        self.ner.get_ner_cache = lambda: None
+        self.ner.detect_languages = detect_languages
+        self.extract = mock.Mock(wraps=extract_entities)
+        self.ner.extract_entities = self.extract
+
+    def test_analyze_many(self):
+        entities = make_entities()
+        results = list(self.ner.analyze_many(entities))
+        # 3 distinct chunks
+        self.assertEqual(self.extract.call_count, 3)
+        self.assertEqual(results[-1].id, "2")
+        self.assertEqual(
+            get_mentions(results),
+            {"0": {"ACME", "BIGCO."}, "1": {"ACME", "BIGCO.", "XYZ."}},
+        )
+        self.assertEqual(entities[0].get("detectedLanguage"), ["eng"])
+        self.assertEqual(entities[1].get("detectedLanguage"), ["eng"])
+
+        # only the configured schemata are analyzed
+        self.extract.reset_mock()
+        results = list(self.ner.analyze_many(make_entities(), {"Person": None}))
+        self.assertEqual(self.extract.call_count, 0)
+        self.assertEqual([p.id for p in results], ["0", "1", "2"])
+
+    def test_cache_key(self):
+        a, b, _ = make_entities()
+        a.add("language", ["eng", "deu"])
+        b.add("language", ["deu", "eng"])
+        self.assertEqual(
+            self.ner._get_cache_key(a, "ACME  funded\nthis"),
+            self.ner._get_cache_key(b, "ACME funded this"),
+        )
+        b.add("language", "fra")
+        self.assertNotEqual(
+            self.ner._get_cache_key(a, "ACME funded this"),
+            self.ner._get_cache_key(b, "ACME funded this"),
+        )
+
+    def test_persistent_cache(self):
+        with TemporaryDirectory() as tmp:
+            store = SQLiteCache(Path(tmp) / "ner.db", max_size=100)
+            self.ner.get_ner_cache = lambda: store
+            expected = get_mentions(self.ner.analyze_many(make_entities()))
+            self.assertEqual(self.extract.call_count, 3)
+            self.assertEqual(len(store), 3)
+
+            # another scope (e.g. the next run) reads the stored chunks
+            self.extract.reset_mock()
+            entities = make_entities()
+            results = get_mentions(self.ner.analyze_many(entities))
+            self.assertEqual(self.extract.call_count, 0)
+            self.assertEqual(results, expected)
+            self.assertEqual(entities[0].get("detectedLanguage"), ["eng"])
+            store.close()
@@ -0,0 +1,118 @@
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+import pika
+from pika.adapters.select_connection import IOLoop
+from pika.frame import Method
+
+from followthegrant.worker.base import BaseWorker
+from followthegrant.worker.publisher import SEQ_HEADER, Publisher
+
+
+class Channel:
+    """record publishes instead of talking to a broker"""
+
+    def __init__(self):
+        self.published = []
+
+    def confirm_delivery(self, callback):
+        self.on_confirm = callback
+
+    def add_on_return_callback(self, callback):
+        self.on_return = callback
+
+    def basic_publish(self, **kwargs):
+        self.published.append(kwargs)
+
+
+def ack(tag, multiple=False):
+    return Method(1, pika.spec.Basic.Ack(delivery_tag=tag, multiple=multiple))
+
+
+def nack(tag, multiple=False):
+    return Method(1, pika.spec.Basic.Nack(delivery_tag=tag, multiple=multiple))
+
+
+class PublisherTestCase(TestCase):
+    def test_publisher(self):
+        channel = Channel()
+        publisher = Publisher(channel, max_retries=1)
+        for i in range(5):
+            publisher.publish("ftg.exchange", "parse", str(i).encode())
+        self.assertEqual(len(channel.published), 5)
+        self.assertEqual(len(publisher), 5)
+
+        channel.on_confirm(ack(3, multiple=True))
+        self.assertEqual(list(publisher.pending), [4, 5])
+
+        # nacked messages are re-published with a new delivery tag
+        channel.on_confirm(nack(4))
+        self.assertEqual(list(publisher.pending), [5, 6])
+        self.assertEqual(channel.published[-1]["body"], b"3")
+
+        # returned messages are re-published after their ack
+        published = channel.published[4]
+        self.assertEqual(published["properties"].headers, {SEQ_HEADER: 5})
+        channel.on_return(channel, None, published["properties"], published["body"])
+        channel.on_confirm(ack(5))
+        self.assertEqual(list(publisher.pending), [6, 7])
+        self.assertEqual(channel.published[-1]["body"], b"4")
+
+        # give up after max retries
+        channel.on_confirm(nack(7, multiple=True))
+        self.assertEqual(publisher.pending, {})
+
+        stats = publisher.get_stats()
+        self.assertEqual(stats["published"], 7)
+        self.assertEqual(stats["confirmed"], 3)
+        self.assertEqual(stats["nacked"], 3)
+        self.assertEqual(stats["returned"], 1)
+        self.assertEqual(stats["republished"], 2)
+        self.assertEqual(stats["failed"], 2)
+        self.assertEqual(stats["outstanding"], 0)
+
+    def test_publisher_window(self):
+        channel = Channel()
+        pumped = []
+
+        def pump(time_limit=0):
+            # confirm everything when waiting for the window
+            pumped.append(time_limit)
+            if time_limit and publisher.pending:
+                channel.on_confirm(ack(max(publisher.pending), multiple=True))
+
+        publisher = Publisher(channel, window=10, pump=pump)
+        for i in range(25):
+            publisher.publish("ftg.exchange", "parse", b"{}")
+            self.assertLessEqual(len(publisher), 10)
+        self.assertEqual(pumped.count(1), 2)
+        publisher.flush()
+        self.assertEqual(len(publisher), 0)
+        self.assertEqual(publisher.get_stats()["confirmed"], 25)
+
+    def test_publisher_properties(self):
+        """the callers properties are not changed"""
+        channel = Channel()
+        publisher = Publisher(channel)
+        properties = pika.BasicProperties(message_id="a", headers={"x": 1})
+        publisher.publish("ftg.exchange", "parse", b"{}", properties=properties)
+        publisher.publish("ftg.exchange", "parse", b"{}", properties=properties)
+        self.assertEqual(properties.message_id, "a")
+        self.assertEqual(properties.headers, {"x": 1})
+        published = channel.published[1]["properties"]
+        self.assertEqual(published.message_id, "a")
+        self.assertEqual(published.headers, {"x": 1, SEQ_HEADER: 2})
+
+    def test_worker_pump(self):
+        worker = BaseWorker()
+        worker._connection = SimpleNamespace(ioloop=IOLoop())
+        ioloop = worker._connection.ioloop
+        start = time.time()
+        worker.pump()
+        # returns when woken up (by a confirm)
+        ioloop.call_later(0.01, ioloop.stop)
+        worker.pump(time_limit=10)
+        self.assertLess(time.time() - start, 5)
+        worker.pump(time_limit=0.01)
+        ioloop.close()
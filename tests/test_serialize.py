@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+from pathlib import Path
+from unittest import TestCase
+
+from followthemoney import model
+
+from followthegrant.serialize import dumps, loads
+
+
+def legacy_dumps(data, sort_keys=False):
+    return json.dumps(data, default=lambda x: str(x), sort_keys=sort_keys)
+
+
+class SerializeTestCase(TestCase):
+    def test_entity_compatibility(self):
+        proxy = model.make_entity("Person")
+        proxy.id = "author-1"
+        proxy.add("name", ["Jane Doe", "Doe, Jane"])
+        proxy.add("birthDate", "1970-01-01")
+        proxy.add("country", "de")
+        data = proxy.to_dict()
+
+        res = dumps(data, sort_keys=True)
+        self.assertIsInstance(res, bytes)
+        self.assertEqual(loads(res), json.loads(legacy_dumps(data, sort_keys=True)))
+        # keys are sorted the same way
+        self.assertEqual(
+            list(loads(res)), list(json.loads(legacy_dumps(data, sort_keys=True)))
+        )
+
+    def test_payload_compatibility(self):
+        payload = {
+            "dataset": "medrxiv",
+            "fpath": Path("/data/medrxiv/1.xml"),
+            "job_id": "ftg-1",
+            "allowed_queues": ["parse", "write"],
+            "started": datetime(2022, 3, 1, 12, 30),
+            "date": date(2022, 3, 1),
+            "counts": {1: "a", 2: "b"},
+            "data": [{"id": "a", "properties": {"name": ["ä ö ü", "中文"]}}],
+        }
+        self.assertEqual(loads(dumps(payload)), json.loads(legacy_dumps(payload)))
+        self.assertEqual(loads(dumps(payload).decode()), loads(dumps(payload)))
+
+        # sets are serialized as lists
+        res = loads(dumps({"values": {"b", "a"}}))
+        self.assertEqual(sorted(res["values"]), ["a", "b"])
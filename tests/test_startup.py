@@ -0,0 +1,52 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+from followthegrant.cli import FLAG_COI_METHODS
+
+# must not be imported by `ftg --help` and the like
+HEAVY_MODULES = (
+    "dateparser",
+    "fasttext",
+    "ftm_columnstore",
+    "ingestors",
+    "networkx",
+    "pandas",
+    "pika",
+    "pydantic",
+    "spacy",
+)
+# cumulative import time of `followthegrant.cli` in seconds
+BUDGET = 1.0
+
+
+def get_import_times(args: list[str]) -> dict[str, float]:
+    code = f"from followthegrant.cli import cli; cli({args!r})"
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    assert res.returncode == 0, res.stderr
+    times = {}
+    for line in res.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+class StartupTestCase(TestCase):
+    def test_startup(self):
+        for args in (["--help"], ["parse", "--help"], ["db", "init", "--help"]):
+            times = get_import_times(args)
+            self.assertLess(times["followthegrant.cli"], BUDGET)
+            imported = {name.split(".")[0] for name in times}
+            for module in HEAVY_MODULES:
+                self.assertNotIn(module, imported, args)
+
+    def test_flag_coi_methods(self):
+        from followthegrant.coi import FLAGGERS
+
+        self.assertEqual(set(FLAG_COI_METHODS), set(FLAGGERS))
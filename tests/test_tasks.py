@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from followthegrant.serialize import dumps, loads
+from followthegrant.worker.tasks import batch_payloads
+
+
+class TasksTestCase(TestCase):
+    def test_batch_payloads(self):
+        payload = {"dataset": "test", "fpath": "/data/1.xml", "job_id": "1"}
+        items = [
+            {"id": str(i), "properties": {"name": ["x" * 100]}} for i in range(250)
+        ]
+
+        batches = list(batch_payloads(payload, items, max_items=100, max_bytes=10**6))
+        self.assertEqual([len(b["data"]) for b in batches], [100, 100, 50])
+        # items are packed pre-serialized
+        batches = [loads(dumps(b)) for b in batches]
+        self.assertEqual([i for b in batches for i in b["data"]], items)
+        for batch in batches:
+            self.assertEqual(batch["fpath"], payload["fpath"])
+        self.assertNotIn("data", payload)
+
+        # size budget
+        max_bytes = 2_000
+        batches = list(
+            batch_payloads(payload, items, max_items=1000, max_bytes=max_bytes)
+        )
+        self.assertEqual([i for b in batches for i in loads(dumps(b))["data"]], items)
+        self.assertGreater(len(batches), 1)
+        for batch in batches:
+            self.assertLessEqual(len(dumps(batch)), max_bytes)
+
+        # too large items are emitted on their own
+        items = [{"id": "big", "summary": "x" * 5_000}, {"id": "small"}]
+        batches = list(
+            batch_payloads(payload, items, max_items=1000, max_bytes=max_bytes)
+        )
+        self.assertEqual([len(b["data"]) for b in batches], [1, 1])
+
+        self.assertEqual(list(batch_payloads(payload, [])), [])
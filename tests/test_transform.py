@@ -0,0 +1,160 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+from followthegrant.exceptions import TransformException
+from followthegrant.model import (
+    Article,
+    Author,
+    Documentation,
+    Grant,
+    Institution,
+    ParsedResult,
+)
+from followthegrant.transform import (
+    get_ner_config,
+    make_affiliations,
+    make_authorships,
+    make_grant_relations,
+    make_proxies,
+)
+
+
+class TransformTestCase(TestCase):
+    def test_ner_config(self):
+        self.assertTrue(get_ner_config(True))
+        self.assertTrue(get_ner_config("true"))
+        self.assertFalse(get_ner_config(False))
+        self.assertFalse(get_ner_config("0"))
+        self.assertFalse(get_ner_config([]))
+        self.assertEqual(
+            get_ner_config("PlainText,Article:summary, Article:title"),
+            {"PlainText": None, "Article": {"summary", "title"}},
+        )
+        self.assertEqual(
+            get_ner_config(["Article:summary", "Article"]), {"Article": None}
+        )
+        config = get_ner_config(["PlainText:bodyText"])
+        self.assertIs(get_ner_config(config), config)
+        with self.assertRaises(TransformException):
+            get_ner_config("Foo")
+        with self.assertRaises(TransformException):
+            get_ner_config("Article:foo")
+
+    def test_no_ner_imports(self):
+        # with ner disabled, the ner stack is not imported at all
+        code = """
+import sys
+from followthegrant.parse import parse
+proxies = list(parse("./testdata/pubmed/pone.0013217.nxml", "jats", ner=False))
+assert proxies
+assert "followthegrant.ner" not in sys.modules
+assert "ingestors" not in sys.modules
+"""
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_xref_relations(self):
+        authors = [
+            Author(name="Jane Doe", xref_affiliation={"aff1", "aff2"}),
+            Author(
+                name="John Doe", xref_employment={"aff1"}, xref_grant_recipient={"g1"}
+            ),
+            Author(name="Max Mustermann", xref_grant_investigator={"g1", "g2"}),
+        ]
+        institutions = [
+            Institution(name="Institution 1", xref={"aff1"}),
+            Institution(name="Institution 2", xref={"aff2"}, xref_grant_funder={"g2"}),
+        ]
+        grants = [
+            Grant(name="Grant 1", xref={"g1"}),
+            Grant(name="Grant 2", xref={"g2"}),
+        ]
+
+        relations = [
+            (
+                r.proxy.schema.name,
+                r.proxy.first(r.proxy.schema.edge_source),
+                r.proxy.first(r.proxy.schema.edge_target),
+                *r.role,
+            )
+            for r in make_affiliations(institutions, authors)
+        ]
+        self.assertEqual(
+            relations,
+            [
+                ("Membership", authors[0].id, institutions[0].id, "AFFILIATION"),
+                ("Employment", authors[1].id, institutions[0].id, "EMPLOYMENT"),
+                ("Membership", authors[0].id, institutions[1].id, "AFFILIATION"),
+            ],
+        )
+        relations = [
+            (*r.project, *r.participant, *r.role)
+            for r in make_grant_relations(grants, authors, institutions)
+        ]
+        self.assertEqual(
+            relations,
+            [
+                (grants[0].id, authors[1].id, "PARTICIPANT"),
+                (grants[0].id, authors[2].id, "INVESTIGATOR"),
+                (grants[1].id, authors[2].id, "INVESTIGATOR"),
+                (grants[1].id, institutions[1].id, "FUNDER"),
+            ],
+        )
+
+    def test_documentation_context(self):
+        article = Article(
+            title="A title ",
+            summary="Summary",
+            publisher=["Journal of Medicine.", " "],
+            publishedAt="2021-01-01",
+        )
+        context = article.documentation_context
+        self.assertEqual(
+            context,
+            {"publisher": {"Journal of Medicine"}, "date": {"2021-01-01"}},
+        )
+        authors = [Author(name="Jane Doe"), Author(name="John Doe")]
+        for doc, author in zip(make_authorships(article, authors), authors):
+            expected = Documentation(
+                document=article.id,
+                entity=author.id,
+                role="AUTHORSHIP",
+                **{**article.properties, "summary": None},
+            )
+            self.assertEqual(doc.id, expected.id)
+            self.assertEqual(doc.proxy.to_dict(), expected.proxy.to_dict())
+        # the shared context is copied into each documentation
+        doc.publisher.add("Other")
+        self.assertEqual(context["publisher"], {"Journal of Medicine"})
+
+    def test_make_proxies_stream(self):
+        data = ParsedResult(
+            journal={"name": "Journal of Medicine"},
+            article={"title": "A title", "summary": "Summary"},
+            institutions=[
+                {"name": "Institution 1", "xref": "aff1"},
+                {"name": "Institution 1", "xref": "aff2", "country": "de"},
+            ],
+            authors=[{"name": "Jane Doe", "xref_affiliation": ["aff1", "aff2"]}],
+        )
+        proxies = make_proxies(data, ner=False)
+        journal = next(proxies)
+        self.assertEqual(journal.schema.name, "Thing")
+        # the following steps are not generated yet
+        self.assertIsInstance(data.article, dict)
+        proxies = list(proxies)
+        ids = [p.id for p in proxies]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            [p.schema.name for p in proxies],
+            [
+                "Organization",
+                "Organization",
+                "Person",
+                "Article",
+                "Documentation",
+                "Documentation",
+                "Membership",
+                "Membership",
+            ],
+        )
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from followthegrant.util import clean_date, parse_date
+
+
+class UtilTestCase(TestCase):
+    def test_clean_date(self):
+        self.assertEqual(parse_date("2021-05-06"), "2021-05-06")
+        self.assertEqual(parse_date("2021-5-6"), "2021-05-06")  # crossref
+        self.assertEqual(parse_date("2021-05"), "2021-05")
+        self.assertEqual(parse_date("2021-05-06T23:30:00.123Z"), "2021-05-06")
+        self.assertEqual(parse_date("2021-05-06T23:30:00-05:00"), "2021-05-06")
+        self.assertEqual(parse_date("2021-05-06 23:30"), "2021-05-06")
+        self.assertIsNone(parse_date("2021-02-30"))
+        self.assertIsNone(parse_date("5 March 2021"))
+
+        self.assertEqual(clean_date(" 2021 "), "2021")
+        self.assertEqual(clean_date("2021-5-6"), "2021-05-06")
+        self.assertEqual(clean_date("5 March 2021"), "2021-03-05")
+        self.assertIsNone(clean_date(""))
+        self.assertIsNone(clean_date(None))